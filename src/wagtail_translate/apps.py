@@ -29,3 +29,11 @@ class WagtailTranslateAppConfig(AppConfig):
             from . import monkeypatch_page  # noqa
         if model_patch_needed():
             from . import monkeypatch_model  # noqa
+
+        from .fields import populate_translatable_fields_cache
+
+        populate_translatable_fields_cache()
+
+        from .metrics import connect_sinks
+
+        connect_sinks()
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class BackgroundAppConfig(AppConfig):
+    label = "wagtail_translate_background"
+    name = "wagtail_translate.background"
+    verbose_name = "Wagtail Translate background translation"
+    default_auto_field = "django.db.models.BigAutoField"
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import TranslationJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Process deferred translation jobs. "
+        "Run as many worker processes as you like."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the pending jobs, and exit.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait for new jobs, when the queue is empty.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=3,
+            help="Number of attempts before a job is marked as failed.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=60 * 60,
+            help="Seconds after which a running job is considered abandoned, and requeued.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            TranslationJob.objects.requeue_stale(
+                options["stale_after"], max_attempts=options["max_attempts"]
+            )
+            job = TranslationJob.objects.claim()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
+                continue
+
+            job.run(max_attempts=options["max_attempts"])
+            if options["verbosity"] > 1 or job.status == job.Status.FAILED:
+                self.stdout.write(f"{job}")
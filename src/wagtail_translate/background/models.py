@@ -0,0 +1,177 @@
+import traceback
+
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+from wagtail.models import Page
+
+
+class TranslationJobQuerySet(models.QuerySet):
+    def enqueue(self, source_obj, target_obj):
+        """
+        Enqueue, records a job to translate source_obj into target_obj.
+
+        Idempotent, a pending job for the same objects is reused.
+        """
+        if isinstance(source_obj, Page):
+            # The specific page type, the source may be a plain Page instance.
+            content_type = source_obj.content_type
+        else:
+            content_type = ContentType.objects.get_for_model(source_obj)
+
+        job, _ = self.get_or_create(
+            content_type=content_type,
+            source_object_id=str(source_obj.pk),
+            target_object_id=str(target_obj.pk),
+            status=TranslationJob.Status.PENDING,
+        )
+        return job
+
+    def claim(self):
+        """
+        Claim, marks the oldest pending job as running, and returns it.
+
+        Safe to run from multiple worker processes. The status is changed with
+        a conditional update, only one worker can win the update.
+        Returns None if there are no pending jobs.
+        """
+        pending = self.filter(status=TranslationJob.Status.PENDING)
+        for pk in pending.order_by("pk").values_list("pk", flat=True)[:10]:
+            claimed = pending.filter(pk=pk).update(
+                status=TranslationJob.Status.RUNNING,
+                attempts=F("attempts") + 1,
+                started_at=timezone.now(),
+            )
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+    def requeue_stale(self, timeout: int, max_attempts: int = 3) -> int:
+        """
+        Requeue stale, resets jobs that are running for longer than
+        `timeout` seconds. For example, because a worker was killed.
+
+        Jobs that have run `max_attempts` times are marked as failed, they may
+        be the cause. So are jobs with a newer pending job for the same objects.
+
+        Returns the number of requeued jobs.
+        """
+        stale = self.filter(
+            status=TranslationJob.Status.RUNNING,
+            started_at__lt=timezone.now() - timedelta(seconds=timeout),
+        )
+        stale.filter(attempts__gte=max_attempts).update(
+            status=TranslationJob.Status.FAILED,
+            error="Abandoned, the job was running for too long.",
+            finished_at=timezone.now(),
+        )
+
+        requeued = 0
+        for pk in stale.values_list("pk", flat=True):
+            try:
+                # A savepoint, the constraint violation must not break
+                # the transaction of the caller.
+                with transaction.atomic():
+                    requeued += stale.filter(pk=pk).update(
+                        status=TranslationJob.Status.PENDING
+                    )
+            except IntegrityError:
+                # Superseded, another job for the same objects is pending.
+                stale.filter(pk=pk).update(
+                    status=TranslationJob.Status.FAILED,
+                    error="Abandoned, superseded by a pending job.",
+                    finished_at=timezone.now(),
+                )
+        return requeued
+
+
+class TranslationJob(models.Model):
+    """
+    A deferred translation, of a source object into a target object.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    source_object_id = models.CharField(max_length=255)
+    target_object_id = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TranslationJobQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "source_object_id", "target_object_id"],
+                condition=models.Q(status="pending"),
+                name="unique_pending_translation_job",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} {self.source_object_id} → {self.target_object_id} ({self.status})"
+
+    def get_objects(self):
+        """Get objects, returns the source and target objects."""
+        manager = self.content_type.model_class()._default_manager
+        return (
+            manager.get(pk=self.source_object_id),
+            manager.get(pk=self.target_object_id),
+        )
+
+    def is_superseded(self) -> bool:
+        """Is superseded, when a new job for the same objects is pending."""
+        return (
+            TranslationJob.objects.filter(
+                content_type=self.content_type,
+                source_object_id=self.source_object_id,
+                target_object_id=self.target_object_id,
+                status=self.Status.PENDING,
+            )
+            .exclude(pk=self.pk)
+            .exists()
+        )
+
+    def run(self, max_attempts: int = 3) -> None:
+        """
+        Run, translates and saves the target object.
+
+        Idempotent, a translation is always made from the current source object.
+        A failed job is retried until it has run `max_attempts` times.
+        """
+        from ..default_behaviour.translation import translate_and_save
+
+        try:
+            translate_and_save(*self.get_objects())
+        except Exception:
+            self.error = traceback.format_exc()
+            if self.attempts >= max_attempts or self.is_superseded():
+                self.status = self.Status.FAILED
+            else:
+                self.status = self.Status.PENDING
+        else:
+            self.error = ""
+            self.status = self.Status.DONE
+        self.finished_at = timezone.now()
+        try:
+            # A savepoint, see `TranslationJobQuerySet.requeue_stale`.
+            with transaction.atomic():
+                self.save(update_fields=["status", "error", "finished_at"])
+        except IntegrityError:
+            # Superseded, a job for the same objects was enqueued meanwhile.
+            self.status = self.Status.FAILED
+            self.save(update_fields=["status", "error", "finished_at"])
@@ -0,0 +1,164 @@
+"""
+Translation cache, keeps translated strings around for reuse.
+
+Two tiers:
+
+- L1, an in-process LRU with a maximum size.
+- L2, a Django cache backend (locmem, filebased, redis, ...), with a timeout.
+  The L2 is shared between processes, if the backend is.
+
+Enable the cache in your settings:
+
+    WAGTAIL_TRANSLATE_CACHE = {
+        "MAX_SIZE": 10000,  # L1 entries, 0 disables the L1.
+        "BACKEND": "default",  # Django cache alias, None disables the L2.
+        "TIMEOUT": 60 * 60 * 24,  # L2 timeout in seconds.
+    }
+"""
+
+import hashlib
+import threading
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+DEFAULTS = {
+    "MAX_SIZE": 10000,
+    "BACKEND": "default",
+    "TIMEOUT": 60 * 60 * 24,
+}
+
+KEY_PREFIX = "wagtail_translate"
+
+
+class TranslationCache:
+    def __init__(
+        self,
+        max_size: int = DEFAULTS["MAX_SIZE"],
+        backend: Optional[str] = DEFAULTS["BACKEND"],
+        timeout: Optional[int] = DEFAULTS["TIMEOUT"],
+    ) -> None:
+        self.max_size = max_size
+        self.backend = backend
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        """Clear, empties the L1. The L2 expires by itself."""
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def make_key(namespace: str, source_string: str) -> str:
+        """
+        Make key, for the L2 backend.
+
+        Hashed, as cache backends limit the length and characters of keys.
+        """
+        digest = hashlib.sha256(f"{namespace}\0{source_string}".encode()).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    def get_many(self, namespace: str, source_strings: List[str]) -> Dict[str, str]:
+        """
+        Get many, returns the cached translations of the source strings.
+
+        The namespace identifies the translator class and language pair.
+        Strings without a cached translation are left out.
+        """
+        unique_strings = list(dict.fromkeys(source_strings))
+        translations = {}
+        with self._lock:
+            for source_string in unique_strings:
+                key = (namespace, source_string)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    translations[source_string] = self._entries[key]
+            self.l1_hits += len(translations)
+
+        missing = [s for s in unique_strings if s not in translations]
+        if missing and self.backend:
+            keys = {self.make_key(namespace, s): s for s in missing}
+            found = caches[self.backend].get_many(list(keys))
+            l2_translations = {keys[key]: value for key, value in found.items()}
+            self._set_l1(namespace, l2_translations)
+            translations.update(l2_translations)
+            with self._lock:
+                self.l2_hits += len(l2_translations)
+
+        with self._lock:
+            self.misses += len(unique_strings) - len(translations)
+        return translations
+
+    def set_many(self, namespace: str, translations: Dict[str, str]) -> None:
+        """Set many, adds the translations to both tiers."""
+        self._set_l1(namespace, translations)
+        if translations and self.backend:
+            caches[self.backend].set_many(
+                {self.make_key(namespace, s): t for s, t in translations.items()},
+                timeout=self.timeout,
+            )
+
+    def _set_l1(self, namespace: str, translations: Dict[str, str]) -> None:
+        if not self.max_size:
+            return
+        with self._lock:
+            for source_string, translation in translations.items():
+                key = (namespace, source_string)
+                self._entries[key] = translation
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+_translation_cache = None
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """
+    Get translation cache, returns the process wide cache,
+    or None if WAGTAIL_TRANSLATE_CACHE is not set.
+    """
+    global _translation_cache
+    config = getattr(settings, "WAGTAIL_TRANSLATE_CACHE", None)
+    if config is None:
+        return None
+    if _translation_cache is None:
+        options = {**DEFAULTS, **config}
+        _translation_cache = TranslationCache(
+            max_size=options["MAX_SIZE"],
+            backend=options["BACKEND"],
+            timeout=options["TIMEOUT"],
+        )
+    return _translation_cache
+
+
+@receiver(setting_changed)
+def reset_translation_cache(setting, **kwargs):
+    global _translation_cache
+    if setting == "WAGTAIL_TRANSLATE_CACHE":
+        _translation_cache = None
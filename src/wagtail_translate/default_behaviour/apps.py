@@ -1,4 +1,5 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+from django.conf import settings
 
 
 class TestAppAppConfig(AppConfig):
@@ -6,3 +7,11 @@ class TestAppAppConfig(AppConfig):
 
     def ready(self):
         from . import signals  # noqa
+
+        if getattr(settings, "WAGTAIL_TRANSLATE_CONCURRENT_SUBTREE", False):
+            from . import monkeypatch_subtree  # noqa
+
+        if getattr(settings, "WAGTAIL_TRANSLATE_FANOUT", False) and apps.is_installed(
+            "wagtail.contrib.simple_translation"
+        ):
+            from . import monkeypatch_fanout  # noqa
@@ -0,0 +1,35 @@
+"""
+Translate a source into all selected locales in one pass.
+
+When WAGTAIL_TRANSLATE_FANOUT is set, the `SubmitTranslationView.post` method
+of `wagtail.contrib.simple_translation` is patched. The new method collects
+the copies for all selected locales, and translates them together, see
+`translate_and_save_many`. The segments of the source are collected once,
+and sent for all target languages concurrently.
+"""
+
+import logging
+
+from django.conf import settings
+from wagtail.contrib.simple_translation.views import SubmitTranslationView
+
+from .translation import collect_translations
+
+
+logger = logging.getLogger(__name__)
+
+original_post = SubmitTranslationView.post
+
+
+def new_post(self, request, **kwargs):
+    if not getattr(settings, "WAGTAIL_TRANSLATE_FANOUT", False):
+        return original_post(self, request, **kwargs)
+
+    with collect_translations():
+        return original_post(self, request, **kwargs)
+
+
+logger.warning(
+    "Monkeypatching wagtail.contrib.simple_translation.views.SubmitTranslationView.post, translate all locales in one pass"
+)
+SubmitTranslationView.post = new_post
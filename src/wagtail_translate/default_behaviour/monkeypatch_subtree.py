@@ -0,0 +1,37 @@
+"""
+Translate the pages of a subtree concurrently.
+
+When WAGTAIL_TRANSLATE_CONCURRENT_SUBTREE is set, the
+`CopyPageForTranslationAction.execute` method is patched.
+With `include_subtree`, the new method collects the copied pages,
+and translates them concurrently once the whole subtree is copied.
+"""
+
+import logging
+
+from django.conf import settings
+from wagtail.actions.copy_for_translation import CopyPageForTranslationAction
+
+from .translation import collect_translations
+
+
+logger = logging.getLogger(__name__)
+
+original_execute = CopyPageForTranslationAction.execute
+
+
+def new_execute(self, skip_permission_checks=False):
+    if not (
+        self.include_subtree
+        and getattr(settings, "WAGTAIL_TRANSLATE_CONCURRENT_SUBTREE", False)
+    ):
+        return original_execute(self, skip_permission_checks=skip_permission_checks)
+
+    with collect_translations():
+        return original_execute(self, skip_permission_checks=skip_permission_checks)
+
+
+logger.warning(
+    "Monkeypatching wagtail.actions.copy_for_translation.CopyPageForTranslationAction.execute, translate subtrees concurrently"
+)
+CopyPageForTranslationAction.execute = new_execute
@@ -1,8 +1,14 @@
-import importlib
-
+from django.apps import apps
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
 from django.dispatch import receiver
-from wagtail.models import Page
+
+from .translation import (  # noqa: F401
+    get_collected_pairs,
+    load_class,
+    translate_and_save,
+)
 
 
 # Wagtail 6.2 introduces the `copy_for_translation_done` signal.
@@ -12,29 +18,38 @@ except ImportError:
     from wagtail_translate.signals import copy_for_translation_done
 
 
-def load_class(class_path):
-    parts = class_path.rsplit(".", 1)
-    module_path = parts[0]
-    class_name = parts[1]
-    module = importlib.import_module(module_path)
-    return getattr(module, class_name)
+def enqueue(source_obj, target_obj):
+    """
+    Enqueue, defers the translation to a background worker.
+    Run the worker with `python manage.py translate_worker`.
+    """
+    if not apps.is_installed("wagtail_translate.background"):
+        raise ImproperlyConfigured(
+            "WAGTAIL_TRANSLATE_BACKGROUND requires "
+            "'wagtail_translate.background' in INSTALLED_APPS."
+        )
+    from ..background.models import TranslationJob
+
+    # Copies of regular Django models (snippets) are not saved yet.
+    # The untranslated copy is saved, so the worker can find it.
+    if target_obj.pk is None:
+        target_obj.save()
+
+    # After the commit, so a worker never claims a job for uncommitted objects.
+    transaction.on_commit(
+        lambda: TranslationJob.objects.enqueue(source_obj, target_obj)
+    )
 
 
 @receiver(copy_for_translation_done)
 def handle_translation_done_signal(sender, source_obj, target_obj, **kwargs):
-    # Get the source and target language codes
-    source_language_code = source_obj.locale.language_code
-    target_language_code = target_obj.locale.language_code
-
-    # Initialize the translator, and translate.
-    loaded_class = load_class(settings.WAGTAIL_TRANSLATE_TRANSLATOR)
-    translator = loaded_class(source_language_code, target_language_code)
-    translated_obj = translator.translate_obj(source_obj, target_obj)
-
-    # Differentiate between regular Django model and Wagtail Page.
-    # - Page instances have `save_revision` and `publish` methods.
-    # - Regular Django model (aka Wagtail Snippet) has a `save` method.
-    if isinstance(translated_obj, Page):
-        translated_obj.save_revision()
+    # Aliases, like the parents created with `copy_parents=True`,
+    # mirror their source page, and are not translated.
+    if getattr(target_obj, "alias_of_id", None):
+        return
+    if getattr(settings, "WAGTAIL_TRANSLATE_BACKGROUND", False):
+        enqueue(source_obj, target_obj)
+    elif (pairs := get_collected_pairs()) is not None:
+        pairs.append((source_obj, target_obj))
     else:
-        translated_obj.save()
+        translate_and_save(source_obj, target_obj)
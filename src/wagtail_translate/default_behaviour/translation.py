@@ -0,0 +1,361 @@
+import copy
+import importlib
+import logging
+import threading
+
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections
+from wagtail.blocks import StreamValue
+from wagtail.fields import StreamField
+from wagtail.models import Page, RevisionMixin
+
+from ..fields import get_translatable_fields
+from ..fingerprints import get_fingerprints, hash_value
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_class(class_path):
+    parts = class_path.rsplit(".", 1)
+    module_path = parts[0]
+    class_name = parts[1]
+    module = importlib.import_module(module_path)
+    return getattr(module, class_name)
+
+
+def get_translator(source_obj, target_obj):
+    """
+    Get translator, initializes the translator from the
+    WAGTAIL_TRANSLATE_TRANSLATOR setting, for the locales of the objects.
+    """
+    # Get the source and target language codes
+    source_language_code = source_obj.locale.language_code
+    target_language_code = target_obj.locale.language_code
+
+    loaded_class = load_class(settings.WAGTAIL_TRANSLATE_TRANSLATOR)
+    return loaded_class(source_language_code, target_language_code)
+
+
+def save(translated_obj):
+    # Differentiate between regular Django model and Wagtail Page.
+    # - Page instances have `save_revision` and `publish` methods.
+    # - Regular Django model (aka Wagtail Snippet) has a `save` method.
+    if isinstance(translated_obj, Page):
+        translated_obj.save_revision()
+    else:
+        translated_obj.save()
+
+
+def translate_and_save(source_obj, target_obj):
+    """
+    Translate and save, translates source_obj into target_obj,
+    with the translator from the WAGTAIL_TRANSLATE_TRANSLATOR setting.
+    """
+    translator = get_translator(source_obj, target_obj)
+    job = translator.prepare_obj(source_obj, target_obj)
+    if job.method is None:
+        # Unchanged since the last translation.
+        return
+    if not translator.raw_streamfields:
+        # Keep the source as it is, it may be translated into other locales.
+        job = job._replace(args=(copy_source(source_obj), *job.args[1:]))
+    save(translator.batch(job.method, *job.args))
+    translator.store_stamp(source_obj, target_obj, job.fingerprints)
+
+
+def get_translated_source(source_obj, target_obj):
+    """
+    Get translated source, returns the version of source_obj that target_obj
+    was translated from, or None if it is unknown.
+
+    For models with revisions, like pages, that is the latest revision of the
+    source that is not newer than the latest revision of the target.
+    """
+    if not isinstance(source_obj, RevisionMixin) or not isinstance(
+        target_obj, RevisionMixin
+    ):
+        return None
+    if target_obj.latest_revision is None:
+        return None
+    revision = (
+        source_obj.revisions.filter(
+            created_at__lte=target_obj.latest_revision.created_at
+        )
+        .order_by("-created_at", "-pk")
+        .first()
+    )
+    return revision.as_object() if revision else None
+
+
+def sync_translation(source_obj, target_obj, translated_source_obj=None):
+    """
+    Sync translation, updates target_obj, an existing translation,
+    after source_obj changed, and saves it.
+
+    Only the fields and StreamField blocks that differ from the translated
+    version of the source, `translated_source_obj`, are translated.
+    It defaults to the source stamp of target_obj, then to
+    `get_translated_source`. If there is none, all fields are translated.
+    See `BaseTranslator.sync_obj`.
+    """
+    translator = get_translator(source_obj, target_obj)
+    fingerprints = get_fingerprints(source_obj)
+    if translated_source_obj is not None:
+        previous = get_fingerprints(translated_source_obj)
+    elif (previous := translator.lookup_stamp(source_obj, target_obj)) is None:
+        translated_source_obj = get_translated_source(source_obj, target_obj)
+        previous = (
+            get_fingerprints(translated_source_obj) if translated_source_obj else {}
+        )
+    if previous == fingerprints:
+        return
+    save(
+        translator.batch(
+            translator.sync_fields, source_obj, target_obj, fingerprints, previous
+        )
+    )
+    translator.store_stamp(source_obj, target_obj, fingerprints)
+
+
+def copy_source(source_obj):
+    """
+    Copy source, a shallow copy of source_obj, with StreamField values of its own.
+
+    Translating a StreamField changes its blocks in place. A source that is
+    translated into several targets is applied to a copy per target, the
+    blocks of the copies are converted from the raw data on access.
+    """
+    obj = copy.copy(source_obj)
+    for field in get_translatable_fields(source_obj.__class__):
+        if isinstance(field, StreamField):
+            raw_data = field.stream_block.get_prep_value(
+                field.value_from_object(source_obj)
+            )
+            value = StreamValue(field.stream_block, raw_data, is_lazy=True)
+            setattr(obj, field.name, value)
+    return obj
+
+
+def get_share_key(translator, source_obj, job):
+    """
+    Get share key, jobs with the same key collect the same segments, and share
+    one collect pass. Returns None if the segments depend on the target.
+    """
+    method, (_, target_obj, *args) = job.method.__name__, job.args
+    previous = None
+    if method == "sync_fields":
+        previous = args[1]
+        if any(isinstance(value, dict) for value in previous.values()):
+            # The blocks are matched with the blocks of the target.
+            return None
+        previous = hash_value(previous)
+    return (
+        translator.__class__,
+        method,
+        id(source_obj),
+        target_obj.__class__,
+        previous,
+    )
+
+
+def translate_and_save_many(pairs, max_workers=None):
+    """
+    Translate and save many, translates a list of (source_obj, target_obj)
+    pairs, and calls the translation service for all pairs concurrently.
+
+    - The segments of all objects are collected, and looked up in the
+      translation cache and memory, on the calling thread.
+    - Each unique string is translated once per translator and language pair,
+      also when it occurs in several objects.
+    - The remaining segments are sent to the translation service from a thread
+      pool, with at most `max_workers` (WAGTAIL_TRANSLATE_MAX_WORKERS) requests
+      in flight.
+    - The translations are applied and saved on the calling thread, in order.
+
+    Database access stays on the calling thread, so this works
+    inside transactions.
+
+    Objects that did not change since their last translation are skipped,
+    see `BaseTranslator.prepare_obj`.
+
+    A source object that is translated into several targets, like a page
+    that is translated into all locales, is walked once to collect its
+    segments, and fingerprinted once. The segments are sent for all target
+    languages concurrently, and applied to each target. See `get_share_key`.
+
+    Returns the counters: objects, unchanged, shared, segments, duplicates,
+    and skipped. `shared` are the objects that reused the segments of an
+    earlier object, `skipped` the strings that need no translation,
+    see `BaseTranslator.skip_segment`.
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, "WAGTAIL_TRANSLATE_MAX_WORKERS", 8)
+
+    pairs = list(pairs)
+    stats = {
+        "objects": 0,
+        "unchanged": 0,
+        "shared": 0,
+        "segments": 0,
+        "duplicates": 0,
+        "skipped": 0,
+    }
+    # The strings that are translated by an earlier job, per translator
+    # and language pair, see BaseTranslator.cache_namespace.
+    claimed = defaultdict(set)
+    # Targets per source object, and the fingerprints of the source objects.
+    targets = Counter(id(source_obj) for source_obj, _ in pairs)
+    fingerprints = {}
+    # The translator and segments of the first job, per share key.
+    collected = {}
+    jobs = []
+    for source_obj, target_obj in pairs:
+        translator = get_translator(source_obj, target_obj)
+        job = translator.prepare_obj(
+            source_obj, target_obj, fingerprints.get(id(source_obj))
+        )
+        fingerprints[id(source_obj)] = job.fingerprints
+        stats["objects"] += 1
+        if job.method is None:
+            stats["unchanged"] += 1
+            continue
+
+        key = get_share_key(translator, source_obj, job)
+        if key in collected:
+            first, source_strings, skipped = collected[key]
+            translator.share_segments(first)
+            stats["shared"] += 1
+        else:
+            source_strings = translator.collect_segments(job.method, *job.args)
+            skipped = translator.stats["skipped"]
+            if key is not None:
+                collected[key] = (translator, source_strings, skipped)
+        stats["skipped"] += skipped
+        if targets[id(source_obj)] > 1 and not translator.raw_streamfields:
+            # Keep the source as it is for the other targets.
+            job = job._replace(args=(copy_source(source_obj), *job.args[1:]))
+
+        unique_strings = translator.count_segments(source_strings)
+        known = translator.lookup_translations(unique_strings)
+        pending = [s for s in unique_strings if s not in known]
+        seen = claimed[translator.cache_namespace]
+        missing = [s for s in pending if s not in seen]
+        seen.update(missing)
+
+        stats["segments"] += len(source_strings)
+        stats["duplicates"] += (
+            len(source_strings) - len(missing) - (len(unique_strings) - len(pending))
+        )
+        jobs.append(
+            (translator, source_obj, target_obj, job, source_strings, known, missing)
+        )
+
+    def translate_missing(translator, missing):
+        try:
+            return translator.translate_missing(missing) if missing else {}
+        finally:
+            # Threads that touched the database need to release their connection.
+            close_old_connections()
+
+    # The translations of the jobs, per translator and language pair.
+    translated = defaultdict(dict)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(translate_missing, translator, missing)
+            for translator, *_, missing in jobs
+        ]
+
+        for (
+            translator,
+            source_obj,
+            target_obj,
+            job,
+            source_strings,
+            known,
+            _,
+        ), future in zip(jobs, futures):
+            new_translations = future.result()
+            translator.store_translations(new_translations)
+            # Strings claimed by an earlier job are translated by now,
+            # as the jobs are applied in order.
+            translations = translated[translator.cache_namespace]
+            translations.update(new_translations)
+            translations = {**translations, **known}
+            save(
+                translator.apply_segments(
+                    job.method,
+                    source_strings,
+                    [translations[s] for s in source_strings],
+                    *job.args,
+                )
+            )
+            translator.store_stamp(source_obj, target_obj, job.fingerprints)
+
+    logger.debug(
+        "Translated %(segments)s segments of %(objects)s objects, "
+        "%(unchanged)s objects were unchanged, %(shared)s shared segments, "
+        "%(duplicates)s duplicates were collapsed, %(skipped)s were skipped.",
+        stats,
+    )
+    return stats
+
+
+def translate_and_save_fanout(source_obj, target_objs, max_workers=None):
+    """
+    Translate and save fan-out, translates source_obj into each of target_objs,
+    for example its copies in all locales, and saves them.
+
+    The segments of source_obj are collected once, and sent to the
+    translation service for all target languages concurrently.
+    See `translate_and_save_many`.
+    """
+    return translate_and_save_many(
+        [(source_obj, target_obj) for target_obj in target_objs],
+        max_workers=max_workers,
+    )
+
+
+_collector = threading.local()
+
+
+def get_collected_pairs():
+    """
+    Get collected pairs, returns the list of (source_obj, target_obj) pairs
+    of the active `collect_translations` block, or None.
+    """
+    return getattr(_collector, "pairs", None)
+
+
+@contextmanager
+def collect_translations(max_workers=None):
+    """
+    Collect translations, a context manager that holds back translations.
+
+    Within the block, the default behaviour collects the source and target
+    objects, instead of translating them one by one. On exit, all collected
+    objects are translated concurrently, see `translate_and_save_many`.
+
+        with collect_translations() as stats:
+            CopyPageForTranslationAction(page, locale, include_subtree=True).execute()
+
+    On exit, `stats` holds the counters of `translate_and_save_many`.
+    Nested blocks join the outer block, their `stats` stay empty.
+    """
+    stats = {}
+    if get_collected_pairs() is not None:
+        yield stats
+        return
+
+    _collector.pairs = []
+    try:
+        yield stats
+        pairs = _collector.pairs
+    finally:
+        _collector.pairs = None
+
+    stats.update(translate_and_save_many(pairs, max_workers=max_workers))
@@ -1,3 +1,6 @@
+import threading
+
+from django.apps import apps
 from django.db import models
 from modelcluster.fields import ParentalKey
 from treebeard.mp_tree import MP_Node
@@ -5,7 +8,61 @@ from wagtail.fields import RichTextField, StreamField
 from wagtail.models import Page, TranslatableMixin
 
 
+# Translatable fields, by model class. See get_translatable_fields.
+_translatable_fields = {}
+_lock = threading.Lock()
+
+
 def get_translatable_fields(model):
+    """
+    Returns the translatable fields of the given model class.
+
+    The fields are derived once per model class, see `find_translatable_fields`,
+    and cached for the lifetime of the process.
+    """
+    try:
+        return _translatable_fields[model]
+    except KeyError:
+        pass
+
+    translatable_fields = find_translatable_fields(model)
+    with _lock:
+        _translatable_fields[model] = translatable_fields
+    return translatable_fields
+
+
+def get_translatable_fields_cache():
+    """
+    Returns a copy of the cache, a dictionary of model classes
+    and their translatable fields. For inspection in tests.
+    """
+    with _lock:
+        return dict(_translatable_fields)
+
+
+def clear_translatable_fields_cache(model=None):
+    """
+    Clears the cache, for the given model class, or for all models.
+    For use in tests, for example after changing `translatable_fields`.
+    """
+    with _lock:
+        if model is None:
+            _translatable_fields.clear()
+        else:
+            _translatable_fields.pop(model, None)
+
+
+def populate_translatable_fields_cache():
+    """
+    Derives the translatable fields of all translatable models.
+    Called when the app is ready, so the first translation doesn't pay for it.
+    """
+    for model in apps.get_models():
+        if issubclass(model, TranslatableMixin):
+            get_translatable_fields(model)
+
+
+def find_translatable_fields(model):
     """
     Derives a list of translatable fields (strings) from the given model class.
 
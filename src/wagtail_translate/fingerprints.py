@@ -0,0 +1,72 @@
+"""
+Fingerprints, compact hashes of the translatable content of an object.
+
+A fingerprint is a dictionary, with per translatable field the hash of its
+value. StreamFields have a hash per top level block, keyed by block id:
+
+    {
+        "title": "3f1c9a0b5e2d7c48",
+        "body": {
+            "c9ba3b6e-...": "a07e44f1b2c3d9e0",
+            "5d1e8c2a-...": "0b9f3c6a1d2e4f58",
+        },
+    }
+
+Compare the fingerprints of the source at the time of the translation with
+the current ones, to find what changed. See `BaseTranslator.sync_obj`.
+"""
+
+import hashlib
+import json
+
+from typing import Dict, Union
+
+from django.core.serializers.json import DjangoJSONEncoder
+from wagtail.fields import StreamField
+
+from .fields import get_translatable_fields
+
+
+Fingerprints = Dict[str, Union[str, Dict[str, str]]]
+
+
+def hash_value(value) -> str:
+    """Hash value, a short SHA-256 hash of the JSON representation of a value."""
+    data = json.dumps(value, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def strip_block_ids(value):
+    """
+    Strip block ids, removes the ids of nested stream and list items.
+    They are generated for data in an older format, and would change the hash.
+    """
+    if isinstance(value, list):
+        return [strip_block_ids(item) for item in value]
+    if isinstance(value, dict):
+        if value.keys() == {"type", "value", "id"}:
+            return {"type": value["type"], "value": strip_block_ids(value["value"])}
+        return {key: strip_block_ids(item) for key, item in value.items()}
+    return value
+
+
+def get_fingerprints(obj) -> Fingerprints:
+    """
+    Get fingerprints, returns the hashes of the translatable fields of obj.
+
+    StreamField blocks are hashed from their raw data, the block
+    definitions are not involved. Top level blocks without an id get one.
+    """
+    fingerprints = {}
+    for field in get_translatable_fields(obj.__class__):
+        value = field.value_from_object(obj)
+        if isinstance(field, StreamField):
+            fingerprints[field.name] = {
+                child["id"]: hash_value(
+                    [child["type"], strip_block_ids(child["value"])]
+                )
+                for child in field.stream_block.get_prep_value(value)
+            }
+        else:
+            fingerprints[field.name] = hash_value(value)
+    return fingerprints
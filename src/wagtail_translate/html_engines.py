@@ -0,0 +1,583 @@
+"""
+HTML engines, find the translatable parts of HTML and put the translations back.
+
+An engine has a single method:
+
+    engine.translate(html, translate_text, translate_attribute, attributes, cache)
+
+- `translate_text(text)` is called for each text node.
+- `translate_attribute(name, value)` is called for each attribute in `attributes`.
+- `cache` is a dict, or None. The translator keeps it for one batch, as
+  collecting and applying the translations walk the same HTML.
+  The engine may keep the tokens of the HTML in it.
+
+Both receive and return unescaped strings, the engine takes care of escaping.
+
+The default `StreamingHTMLEngine` tokenizes once, and splices the translations
+into the original markup. Everything else is kept byte-for-byte.
+The `PlaceholderHTMLEngine` translates running text, including inline tags,
+as one segment.
+The `BeautifulSoupEngine` parses into a tree, and serializes the tree.
+
+Elements with `translate="no"`, and the elements that match one of the
+WAGTAIL_TRANSLATE_SKIP_SELECTORS, are kept as they are, including their
+content. The selectors are tag names, classes, or both:
+
+    WAGTAIL_TRANSLATE_SKIP_SELECTORS = ["code", "pre", "script", "style", ".notranslate"]
+"""
+
+import re
+
+from functools import lru_cache
+from html import escape, unescape
+from html.parser import HTMLParser
+from typing import Callable, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+
+TEXT = "text"
+START_TAG = "starttag"
+END_TAG = "endtag"
+OTHER = "other"  # Comments, doctypes, processing instructions, etc.
+SKIPPED = "skipped"  # An element that is not translated, with its content.
+
+
+class Attribute(NamedTuple):
+    name: str
+    value: str  # Unescaped
+    start: int  # Offset of the raw value in the HTML, without quotes
+    end: int
+    quote: str  # The quote character, or "" for unquoted values
+
+
+class Token(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    tag: Optional[str] = None
+    text: Optional[str] = None  # Unescaped, for text tokens
+    attrs: Tuple[Attribute, ...] = ()
+
+
+# Attributes in a start tag, after the tag name.
+ATTRIBUTE_RE = re.compile(
+    r"""(?P<name>[^\s/>"'=]+)"""
+    r"""(?:\s*=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<uq>[^\s>"'=<`]+)))?"""
+)
+TAG_NAME_RE = re.compile(r"<[^\s/>]+")
+
+
+def parse_attributes(tag_text: str, offset: int) -> Tuple[Attribute, ...]:
+    """
+    Parse attributes, returns the attributes of a raw start tag,
+    with the positions of their values in the HTML.
+    """
+    attributes = []
+    position = TAG_NAME_RE.match(tag_text).end()
+    for match in ATTRIBUTE_RE.finditer(tag_text, position):
+        for group, quote in (("dq", '"'), ("sq", "'"), ("uq", "")):
+            if match.group(group) is not None:
+                attributes.append(
+                    Attribute(
+                        name=match.group("name").lower(),
+                        value=unescape(match.group(group)),
+                        start=offset + match.start(group),
+                        end=offset + match.end(group),
+                        quote=quote,
+                    )
+                )
+                break
+    return tuple(attributes)
+
+
+class Tokenizer(HTMLParser):
+    """
+    Tokenizer, a single pass over the HTML, with the Python standard library parser.
+
+    The parser reports line and column of each construct. These are converted
+    to offsets, the end of a construct is the start of the next.
+    """
+
+    def __init__(self, html: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.line_offsets = [0]
+        for match in re.finditer("\n", html):
+            self.line_offsets.append(match.end())
+        self.events = []
+
+    def get_offset(self) -> int:
+        line, column = self.getpos()
+        return self.line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        self.add_tag(START_TAG, tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.add_tag(START_TAG, tag)
+
+    def add_tag(self, kind, tag):
+        start = self.get_offset()
+        tag_text = self.get_starttag_text()
+        self.events.append((kind, start, tag, None, parse_attributes(tag_text, start)))
+
+    def handle_endtag(self, tag):
+        self.events.append((END_TAG, self.get_offset(), tag, None, ()))
+
+    def handle_data(self, data):
+        self.events.append((TEXT, self.get_offset(), None, data, ()))
+
+    def handle_other(self, *args):
+        self.events.append((OTHER, self.get_offset(), None, None, ()))
+
+    handle_comment = handle_other
+    handle_decl = handle_other
+    handle_pi = handle_other
+    unknown_decl = handle_other
+
+    def tokenize(self) -> List[Token]:
+        self.feed(self.html)
+        self.close()
+        tokens = []
+        for i, (kind, start, tag, text, attrs) in enumerate(self.events):
+            end = self.events[i + 1][1] if i + 1 < len(self.events) else len(self.html)
+            if tokens and kind == TEXT and tokens[-1].kind == TEXT:
+                # The parser may report a text node in multiple chunks.
+                previous = tokens.pop()
+                start, text = previous.start, previous.text + text
+            tokens.append(Token(kind, start, end, tag, text, attrs))
+        return tokens
+
+
+def tokenize(html: str) -> Tuple[Token, ...]:
+    """
+    Tokenize, returns the tokens of the HTML.
+
+    Input without tags is a single text token, and is not parsed.
+    """
+    if "<" not in html:
+        return (Token(TEXT, 0, len(html), text=unescape(html)),)
+    return tuple(Tokenizer(html).tokenize())
+
+
+SKIP_SELECTORS = ("code", "pre", "script", "style", ".notranslate")
+
+# Elements without content, they have no end tag.
+VOID_TAGS = frozenset(
+    (
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+        "meta", "param", "source", "track", "wbr",
+    )
+)  # fmt: skip
+
+
+class Selector(NamedTuple):
+    tag: Optional[str]
+    classes: FrozenSet[str]
+
+
+@lru_cache(maxsize=None)
+def compile_selectors(selectors: Tuple[str, ...]) -> Tuple[Selector, ...]:
+    """
+    Compile selectors, parses `tag`, `.class` and `tag.class.other` selectors.
+    """
+    compiled = []
+    for selector in selectors:
+        tag, *classes = selector.strip().lower().split(".")
+        compiled.append(Selector(tag or None, frozenset(classes)))
+    return tuple(compiled)
+
+
+def get_skip_selectors(selectors: Optional[Sequence[str]] = None):
+    """
+    Get skip selectors, the compiled selectors, or those of the
+    WAGTAIL_TRANSLATE_SKIP_SELECTORS setting.
+    """
+    if selectors is None:
+        selectors = getattr(
+            settings, "WAGTAIL_TRANSLATE_SKIP_SELECTORS", SKIP_SELECTORS
+        )
+    return compile_selectors(tuple(selectors))
+
+
+def is_skipped(token: Token, selectors: Tuple[Selector, ...]) -> bool:
+    """
+    Is skipped, whether a start tag has `translate="no"`, or matches a selector.
+    """
+    classes = frozenset()
+    for attribute in token.attrs:
+        if attribute.name == "translate" and attribute.value.strip().lower() == "no":
+            return True
+        if attribute.name == "class":
+            classes = frozenset(attribute.value.lower().split())
+    return any(
+        (selector.tag is None or selector.tag == token.tag)
+        and selector.classes <= classes
+        for selector in selectors
+    )
+
+
+def skip_subtrees(html: str, tokens, selectors) -> List[Token]:
+    """
+    Skip subtrees, replaces the tokens of each skipped element, from its start
+    tag to its end tag, by a single SKIPPED token. An element that is not
+    closed runs to the end of the HTML.
+    """
+    result = []
+    tokens = iter(tokens)
+    for token in tokens:
+        if token.kind != START_TAG or not is_skipped(token, selectors):
+            result.append(token)
+            continue
+        end = token.end
+        if token.tag not in VOID_TAGS and not html[token.start : end].endswith("/>"):
+            # Nested elements with the same tag, up to the matching end tag.
+            depth = 1
+            for inner in tokens:
+                end = inner.end
+                if inner.tag == token.tag:
+                    depth += 1 if inner.kind == START_TAG else -1
+                    if depth == 0:
+                        break
+        result.append(Token(SKIPPED, token.start, end, token.tag))
+    return result
+
+
+def get_tokens(html: str, selectors: Tuple[Selector, ...]) -> Tuple[Token, ...]:
+    """
+    Get tokens, the tokens of the HTML, with the skipped elements as
+    SKIPPED tokens. Their content is not translated, see `skip_subtrees`.
+    """
+    tokens = tokenize(html)
+    if "<" not in html:
+        return tokens
+    return tuple(skip_subtrees(html, tokens, selectors))
+
+
+class StreamingHTMLEngine:
+    # Tag, class and tag.class selectors of the elements that are not
+    # translated. Defaults to the WAGTAIL_TRANSLATE_SKIP_SELECTORS setting.
+    skip_selectors = None
+
+    def __init__(self, skip_selectors: Optional[Sequence[str]] = None) -> None:
+        if skip_selectors is not None:
+            self.skip_selectors = skip_selectors
+
+    def get_tokens(self, html: str, cache: Optional[dict] = None) -> Tuple[Token, ...]:
+        """
+        Get tokens, the tokens of the HTML, kept in `cache` if it is given.
+        """
+        selectors = get_skip_selectors(self.skip_selectors)
+        if cache is None:
+            return get_tokens(html, selectors)
+        key = (html, selectors)
+        if key not in cache:
+            cache[key] = get_tokens(html, selectors)
+        return cache[key]
+
+    def translate(
+        self,
+        html: str,
+        translate_text: Callable[[str], str],
+        translate_attribute: Callable[[str, str], str],
+        attributes=("title", "alt"),
+        cache: Optional[dict] = None,
+    ) -> str:
+        parts = [
+            self.translate_token(
+                html, token, translate_text, translate_attribute, attributes
+            )
+            for token in self.get_tokens(html, cache)
+        ]
+        return "".join(parts)
+
+    def translate_token(
+        self, html, token, translate_text, translate_attribute, attributes
+    ) -> str:
+        """
+        Translate token, returns the markup of the token, translated.
+        Untranslated parts are returned as is.
+        """
+        raw = html[token.start : token.end]
+        if token.kind == TEXT:
+            translation = translate_text(token.text)
+            if translation == token.text:
+                return raw
+            return escape(translation, quote=False)
+        if token.kind == START_TAG:
+            return self.translate_tag(html, token, translate_attribute, attributes)
+        return raw
+
+    def translate_tag(self, html, token, translate_attribute, attributes) -> str:
+        """
+        Translate tag, returns the markup of a start tag,
+        with the values of the attributes translated.
+        """
+        parts = []
+        position = token.start
+        for attribute in token.attrs:
+            if attribute.name not in attributes:
+                continue
+            translation = translate_attribute(attribute.name, attribute.value)
+            if translation != attribute.value:
+                replacement = escape(translation)
+                if not attribute.quote:
+                    replacement = f'"{replacement}"'
+                parts.append(html[position : attribute.start])
+                parts.append(replacement)
+                position = attribute.end
+        parts.append(html[position : token.end])
+        return "".join(parts)
+
+
+# Tags that are part of the running text. Any other tag, like p, li, h1-h6
+# and td, ends a segment in the PlaceholderHTMLEngine.
+INLINE_TAGS = frozenset(
+    (
+        "a", "abbr", "b", "bdi", "bdo", "br", "cite", "code", "data", "dfn", "del",
+        "em", "i", "img", "ins", "kbd", "mark", "q", "s", "small", "span",
+        "strong", "sub", "sup", "time", "u", "var", "wbr",
+    )
+)  # fmt: skip
+
+PLACEHOLDER_RE = re.compile(r"⟦\s*(/?)\s*(\d+)\s*(/?)\s*⟧")
+
+
+class PlaceholderHTMLEngine(StreamingHTMLEngine):
+    """
+    Placeholder HTML engine, translates running text as one segment.
+
+    Text and inline tags between block-level tags are a single segment.
+    The inline tags are replaced by placeholders, and restored afterwards:
+
+        <p>The <em>black</em> cat</p>
+
+    is translated as `The ⟦1⟧black⟦/1⟧ cat`, and may come back as
+    `Le chat ⟦1⟧noir⟦/1⟧`. Self-closing tags, like `<br>`, become `⟦1/⟧`.
+
+    If the placeholders are missing, duplicated, or out of order in the
+    translation, the translations of the text nodes are used instead.
+    The text nodes are translated along with the segment, so the fallback
+    is part of the same batch, see `BaseTranslator.batch`.
+    """
+
+    inline_tags = INLINE_TAGS
+
+    def translate(
+        self,
+        html: str,
+        translate_text: Callable[[str], str],
+        translate_attribute: Callable[[str, str], str],
+        attributes=("title", "alt"),
+        cache: Optional[dict] = None,
+    ) -> str:
+        parts = []
+        run = []
+        for token in self.get_tokens(html, cache):
+            if self.is_inline(token):
+                run.append(token)
+                continue
+            parts.append(
+                self.translate_run(
+                    html, run, translate_text, translate_attribute, attributes
+                )
+            )
+            run = []
+            parts.append(
+                self.translate_token(
+                    html, token, translate_text, translate_attribute, attributes
+                )
+            )
+        parts.append(
+            self.translate_run(
+                html, run, translate_text, translate_attribute, attributes
+            )
+        )
+        return "".join(parts)
+
+    def is_inline(self, token) -> bool:
+        # A skipped inline element is a self-closing placeholder, like `<br>`.
+        return token.kind == TEXT or (
+            token.kind in (START_TAG, END_TAG, SKIPPED)
+            and token.tag in self.inline_tags
+        )
+
+    def translate_run(
+        self, html, run, translate_text, translate_attribute, attributes
+    ) -> str:
+        """
+        Translate run, a sequence of text and inline tags.
+        """
+        texts = [t for t in run if t.kind == TEXT and t.text.strip()]
+        if len(texts) < 2 or any("⟦" in t.text for t in texts):
+            # Nothing to gain, or the text looks like placeholders.
+            return "".join(
+                self.translate_token(
+                    html, token, translate_text, translate_attribute, attributes
+                )
+                for token in run
+            )
+
+        numbered = self.number_tokens(run)
+        paired = {-number for number, _ in numbered if number and number < 0}
+        tags = {}  # Placeholder number, markup of the tag. Negative for end tags.
+        segment = []
+        for number, token in numbered:
+            if number is None:
+                segment.append(token.text)
+                continue
+            if token.kind == START_TAG:
+                tags[number] = self.translate_tag(
+                    html, token, translate_attribute, attributes
+                )
+            else:
+                tags[number] = html[token.start : token.end]
+            if number < 0:
+                segment.append(f"⟦/{-number}⟧")
+            elif number in paired:
+                segment.append(f"⟦{number}⟧")
+            else:
+                segment.append(f"⟦{number}/⟧")
+
+        translation = translate_text("".join(segment))
+        # Translated in both passes of a batch, whether they are used or not.
+        fallback = [
+            self.translate_token(
+                html, token, translate_text, translate_attribute, attributes
+            )
+            for number, token in numbered
+            if number is None
+        ]
+        restored = self.restore(translation, tags)
+        if restored is None:
+            # Mangled placeholders, use the translations of the text nodes.
+            fallback = iter(fallback)
+            return "".join(
+                next(fallback) if number is None else tags[number]
+                for number, _ in numbered
+            )
+        return restored
+
+    @staticmethod
+    def number_tokens(run) -> List[Tuple[Optional[int], Token]]:
+        """
+        Number tokens, pairs the tokens of a run with their placeholder numbers.
+
+        End tags get the negative number of their start tag.
+        Unpaired tags get a number of their own, text tokens get None.
+        """
+        numbered = []
+        stack = []
+        count = 0
+        for token in run:
+            if token.kind == TEXT:
+                numbered.append((None, token))
+            elif token.kind == END_TAG and stack and stack[-1][0] == token.tag:
+                numbered.append((-stack.pop()[1], token))
+            else:
+                count += 1
+                numbered.append((count, token))
+                if token.kind == START_TAG:
+                    stack.append((token.tag, count))
+        return numbered
+
+    @staticmethod
+    def restore(translation, tags):
+        """
+        Restore, replaces the placeholders in the translation by their tags.
+
+        Returns None if each placeholder does not occur exactly once,
+        or if the paired placeholders are not properly nested.
+        """
+        parts = []
+        seen = set()
+        stack = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(translation):
+            closing, number, self_closing = match.groups()
+            number = int(number)
+            if closing and self_closing:
+                return None
+            if closing:
+                if not stack or stack.pop() != number:
+                    return None
+                key = -number
+            else:
+                key = number
+                if not self_closing:
+                    stack.append(number)
+                if (self_closing and -number in tags) or (
+                    not self_closing and -number not in tags
+                ):
+                    return None
+            if key not in tags or key in seen:
+                return None
+            seen.add(key)
+            parts.append(escape(translation[position : match.start()], quote=False))
+            parts.append(tags[key])
+            position = match.end()
+        if stack or len(seen) != len(tags):
+            return None
+        parts.append(escape(translation[position:], quote=False))
+        return "".join(parts)
+
+
+class BeautifulSoupEngine:
+    """
+    BeautifulSoup engine, requires `beautifulsoup4`.
+
+    Recursively walks the HTML tree, and serializes the tree.
+    The markup is normalized, for example `<br>` becomes `<br/>`.
+    Skipped elements are not walked, see `StreamingHTMLEngine.skip_selectors`.
+    """
+
+    skip_selectors = None
+
+    def __init__(self, skip_selectors: Optional[Sequence[str]] = None) -> None:
+        if skip_selectors is not None:
+            self.skip_selectors = skip_selectors
+
+    def translate(
+        self,
+        html: str,
+        translate_text: Callable[[str], str],
+        translate_attribute: Callable[[str, str], str],
+        attributes=("title", "alt"),
+        cache: Optional[dict] = None,
+    ) -> str:
+        from bs4 import BeautifulSoup, NavigableString
+
+        soup = BeautifulSoup(html, "html.parser")
+        selectors = get_skip_selectors(self.skip_selectors)
+        tags = []
+
+        def walk(soup):
+            for child in soup.children:
+                if isinstance(child, NavigableString):
+                    # Translate navigable strings
+                    child.string.replace_with(translate_text(child.string))
+                elif not self.is_skipped(child, selectors):
+                    # Recursively walk the tree
+                    tags.append(child)
+                    walk(child)
+
+        walk(soup)
+
+        for tag in tags:
+            for name in attributes:
+                if tag.has_attr(name):
+                    tag[name] = translate_attribute(name, tag[name])
+
+        return str(soup)
+
+    @staticmethod
+    def is_skipped(tag, selectors) -> bool:
+        if str(tag.get("translate", "")).strip().lower() == "no":
+            return True
+        classes = frozenset(c.lower() for c in tag.get("class") or ())
+        return any(
+            (selector.tag is None or selector.tag == tag.name)
+            and selector.classes <= classes
+            for selector in selectors
+        )
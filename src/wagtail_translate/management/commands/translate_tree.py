@@ -0,0 +1,246 @@
+import json
+import os
+
+from itertools import islice
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from wagtail.actions.copy_for_translation import CopyPageForTranslationAction
+from wagtail.models import Locale, Page, TranslatableMixin
+from wagtail.snippets.models import get_snippet_models
+
+from ...default_behaviour.translation import (
+    collect_translations,
+    get_collected_pairs,
+)
+
+
+DEFAULT_BEHAVIOUR_APP = "wagtail_translate.default_behaviour"
+
+
+class Checkpoint:
+    """
+    Checkpoint, a JSON file with the last processed object per
+    target locale and model. Written after each committed chunk.
+    """
+
+    def __init__(self, path: str, restart: bool = False) -> None:
+        self.path = path
+        self.data = {}
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value) -> None:
+        self.data[key] = value
+        # Write and rename, an interrupted write leaves the previous checkpoint.
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+    def delete(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy and translate the missing translations of a page tree, "
+        "and of the translatable snippets. Resumes an interrupted run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("root", type=int, help="ID of the root page.")
+        parser.add_argument(
+            "target_locales",
+            nargs="+",
+            metavar="target_locale",
+            help="Language codes of the locales to translate into.",
+        )
+        parser.add_argument(
+            "--source-locale",
+            help="Language code of the locale to translate from. "
+            "Defaults to the locale of the root page.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Number of objects per transaction, and per checkpoint.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Concurrent requests to the translation service. "
+            "Defaults to WAGTAIL_TRANSLATE_MAX_WORKERS.",
+        )
+        parser.add_argument(
+            "--no-snippets",
+            action="store_true",
+            help="Only translate pages.",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Also translate the existing translations again. Install "
+            "wagtail_translate.stamps to skip the ones that did not change.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Path of the checkpoint file. "
+            "Defaults to translate_tree_<root>.json in the working directory.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint, and start over.",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        root = self.get_root(options["root"], options["source_locale"])
+        target_locales = [self.get_locale(code) for code in options["target_locales"]]
+        checkpoint = Checkpoint(
+            options["checkpoint"] or f"translate_tree_{options['root']}.json",
+            restart=options["restart"],
+        )
+
+        for locale in target_locales:
+            for name, objects, order_field in self.get_sources(root):
+                key = f"{name}:{locale.language_code}"
+                translation_keys = self.get_translation_keys(objects.model, locale)
+                if options["sync"]:
+                    self.translate(
+                        objects.filter(translation_key__in=translation_keys),
+                        order_field,
+                        locale,
+                        checkpoint,
+                        f"sync:{key}",
+                        self.sync_translations,
+                    )
+                self.translate(
+                    objects.exclude(translation_key__in=translation_keys),
+                    order_field,
+                    locale,
+                    checkpoint,
+                    key,
+                    self.copy_for_translation,
+                )
+
+        checkpoint.delete()
+
+    def get_root(self, page_id, source_locale):
+        try:
+            root = Page.objects.get(pk=page_id)
+        except Page.DoesNotExist as e:
+            raise CommandError(f"Page {page_id} does not exist.") from e
+        if source_locale:
+            root = root.get_translation_or_none(self.get_locale(source_locale))
+            if root is None:
+                raise CommandError(
+                    f"Page {page_id} has no translation in '{source_locale}'."
+                )
+        return root
+
+    @staticmethod
+    def get_locale(language_code):
+        try:
+            return Locale.objects.get(language_code=language_code)
+        except Locale.DoesNotExist as e:
+            raise CommandError(f"Locale '{language_code}' does not exist.") from e
+
+    def get_sources(self, root):
+        """
+        Get sources, yields a name, a queryset of source objects, and the field
+        they are ordered by, for the pages under root, and for each snippet model.
+        """
+        pages = Page.objects.descendant_of(root, inclusive=True).filter(
+            locale=root.locale
+        )
+        yield "pages", pages.order_by("path"), "path"
+
+        if self.options["no_snippets"]:
+            return
+        for model in get_snippet_models():
+            if issubclass(model, TranslatableMixin):
+                objects = model.objects.filter(locale=root.locale).order_by("pk")
+                yield f"snippets:{model._meta.label_lower}", objects, "pk"
+
+    @staticmethod
+    def get_translation_keys(model, locale):
+        return model.objects.filter(locale=locale).values("translation_key")
+
+    def translate(self, queryset, order_field, locale, checkpoint, key, process):
+        """
+        Translate, translates the objects of the queryset,
+        with `copy_for_translation` or `sync_translations`.
+
+        The objects are streamed, and processed in chunks. Each chunk is
+        committed, translated concurrently, and recorded in the checkpoint.
+        """
+        if (last := checkpoint.get(key)) is not None:
+            queryset = queryset.filter(**{f"{order_field}__gt": last})
+        if queryset.model is Page:
+            queryset = queryset.specific()
+
+        chunk_size = self.options["chunk_size"]
+        count = 0
+        for chunk in chunked(queryset.iterator(chunk_size=chunk_size), chunk_size):
+            with transaction.atomic():
+                with collect_translations(max_workers=self.options["workers"]) as stats:
+                    process(chunk, locale)
+            checkpoint.set(key, getattr(chunk[-1], order_field))
+            count += len(chunk)
+            if self.options["verbosity"] > 0:
+                unchanged = stats.get("unchanged", 0)
+                self.stdout.write(f"{key}: {count} processed, {unchanged} unchanged")
+
+    def copy_for_translation(self, chunk, locale):
+        """
+        Copy for translation, the copies are translated by the default behaviour.
+        Without the default behaviour, the copies are translated directly.
+        """
+        for obj in chunk:
+            if isinstance(obj, Page):
+                translation = CopyPageForTranslationAction(
+                    obj, locale, copy_parents=True
+                ).execute(skip_permission_checks=True)
+            else:
+                translation = obj.copy_for_translation(locale)
+
+            if not apps.is_installed(DEFAULT_BEHAVIOUR_APP):
+                get_collected_pairs().append((obj, translation))
+
+    def sync_translations(self, chunk, locale):
+        """
+        Sync translations, translates the existing translations again.
+        With `wagtail_translate.stamps`, objects and fields that did not
+        change since their translation are skipped.
+        """
+        model = Page if isinstance(chunk[0], Page) else chunk[0].__class__
+        translations = model.objects.filter(
+            translation_key__in=[obj.translation_key for obj in chunk],
+            locale=locale,
+        )
+        if model is Page:
+            translations = translations.specific()
+        translations = {obj.translation_key: obj for obj in translations}
+
+        for obj in chunk:
+            translation = translations[obj.translation_key]
+            if isinstance(translation, Page):
+                # A draft translation has its content in the latest revision.
+                translation = translation.get_latest_revision_as_object()
+            get_collected_pairs().append((obj, translation))
@@ -0,0 +1,386 @@
+"""
+Metrics, sinks for the instrumentation signals in `wagtail_translate.signals`.
+
+Enable sinks in your settings:
+
+    WAGTAIL_TRANSLATE_METRICS = [
+        "wagtail_translate.metrics.LoggingSink",
+        "wagtail_translate.metrics.PrometheusSink",
+    ]
+
+- `LoggingSink` logs the events to the `wagtail_translate.metrics` logger.
+  Translated batches at INFO level, all other events at DEBUG level.
+- `PrometheusSink` aggregates the events in process, and `metrics_view`
+  exports them in the Prometheus text format:
+
+      # urls.py
+      from wagtail_translate.metrics import metrics_view
+
+      urlpatterns = [
+          path("translate-metrics/", metrics_view),
+          ...
+      ]
+
+The metrics are per process. With multiple worker processes, each process
+reports its own metrics. Restrict access to the view, for example in your
+web server, as it is not authenticated.
+"""
+
+import logging
+import threading
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from django.utils.module_loading import import_string
+
+from . import signals
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a cached lookup to a slow translation service.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class BaseSink:
+    """
+    Base sink, connects a method per signal.
+
+    Subclasses implement the methods they need, with the arguments
+    of the signal as keyword arguments.
+    """
+
+    handlers = {
+        "translation_requested": signals.translation_requested,
+        "segments_translated": signals.segments_translated,
+        "field_translated": signals.field_translated,
+        "block_translated": signals.block_translated,
+        "related_translations_fetched": signals.related_translations_fetched,
+        "translations_looked_up": signals.translations_looked_up,
+    }
+
+    def connect(self) -> None:
+        for name, signal in self.handlers.items():
+            if hasattr(self, name):
+                signal.connect(
+                    getattr(self, name), weak=False, dispatch_uid=(id(self), name)
+                )
+
+    def disconnect(self) -> None:
+        for name, signal in self.handlers.items():
+            signal.disconnect(dispatch_uid=(id(self), name))
+
+
+def get_model_label(model) -> str:
+    return model._meta.label_lower
+
+
+class LoggingSink(BaseSink):
+    def translation_requested(
+        self, translator, segments, characters, duration, **kwargs
+    ):
+        logger.debug(
+            "Request of %s segments (%s characters) took %.3fs",
+            segments,
+            characters,
+            duration,
+        )
+
+    def segments_translated(self, translator, segments, characters, duration, **kwargs):
+        logger.info(
+            "Translated %s segments (%s characters) from %s to %s in %.3fs",
+            segments,
+            characters,
+            translator.source_language_code,
+            translator.target_language_code,
+            duration,
+        )
+
+    def field_translated(self, translator, model, field, phase, duration, **kwargs):
+        logger.debug(
+            "Field %s.%s (%s) took %.3fs",
+            get_model_label(model),
+            field,
+            phase,
+            duration,
+        )
+
+    def block_translated(self, translator, block_type, phase, duration, **kwargs):
+        logger.debug("Block %s (%s) took %.3fs", block_type, phase, duration)
+
+    def related_translations_fetched(
+        self, translator, model, objects, queries, duration, **kwargs
+    ):
+        logger.debug(
+            "Fetched translations of %s %s objects with %s queries in %.3fs",
+            objects,
+            get_model_label(model),
+            queries,
+            duration,
+        )
+
+    def translations_looked_up(self, translator, store, hits, misses, **kwargs):
+        logger.debug("Translation %s: %s hits, %s misses", store, hits, misses)
+
+
+class Metric:
+    """
+    Metric, a Prometheus metric, with values per combination of labels.
+    """
+
+    type = None
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.lock = threading.Lock()
+
+    def label_values(self, values: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(values[label]) for label in self.labels)
+
+    def format_labels(self, values: Tuple[str, ...], **extra) -> str:
+        pairs = [*zip(self.labels, values), *extra.items()]
+        if not pairs:
+            return ""
+        escaped = (
+            (name, value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        with self.lock:
+            self.values[self.label_values(labels)] += amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.label_values(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = sorted(self.values.items())
+        return [
+            f"{self.name}{self.format_labels(labels)} {value}"
+            for labels, value in values
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets=DURATION_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # Per combination of labels: the counts per bucket, the sum and the count.
+        self.values = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.label_values(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def get(self, **labels) -> Optional[Tuple[List[int], float, int]]:
+        return self.values.get(self.label_values(labels))
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = sorted(
+                (k, (list(c), t, n)) for k, (c, t, n) in self.values.items()
+            )
+        lines = []
+        for labels, (counts, total, count) in values:
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = self.format_labels(labels, le=str(float(bound)))
+                lines.append(f"{self.name}_bucket{le} {bucket_count}")
+            le = self.format_labels(labels, le="+Inf")
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{self.format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{self.format_labels(labels)} {count}")
+        return lines
+
+
+LANGUAGE_PAIR = ("translator", "source", "target")
+
+
+def get_language_pair(translator) -> Dict[str, str]:
+    return {
+        "translator": translator.__class__.__name__,
+        "source": translator.source_language_code,
+        "target": translator.target_language_code,
+    }
+
+
+class PrometheusSink(BaseSink):
+    def __init__(self) -> None:
+        self.requests = Counter(
+            "wagtail_translate_requests_total",
+            "Calls to the translation service.",
+            LANGUAGE_PAIR,
+        )
+        self.segments = Counter(
+            "wagtail_translate_segments_total",
+            "Strings sent to the translation service.",
+            LANGUAGE_PAIR,
+        )
+        self.characters = Counter(
+            "wagtail_translate_characters_total",
+            "Characters sent to the translation service.",
+            LANGUAGE_PAIR,
+        )
+        self.request_duration = Histogram(
+            "wagtail_translate_request_duration_seconds",
+            "Duration of calls to the translation service.",
+            LANGUAGE_PAIR,
+        )
+        self.batch_duration = Histogram(
+            "wagtail_translate_batch_duration_seconds",
+            "Duration of translating the missing strings of a batch.",
+            LANGUAGE_PAIR,
+        )
+        self.field_duration = Histogram(
+            "wagtail_translate_field_duration_seconds",
+            "Duration of translating a field, per batch phase.",
+            ("model", "field", "phase"),
+        )
+        self.block_duration = Histogram(
+            "wagtail_translate_block_duration_seconds",
+            "Duration of translating a block, including child blocks, per batch phase.",
+            ("block_type", "phase"),
+        )
+        self.related_objects = Counter(
+            "wagtail_translate_related_objects_total",
+            "Related objects of which the translation is fetched.",
+            ("model",),
+        )
+        self.related_queries = Counter(
+            "wagtail_translate_related_queries_total",
+            "Database queries to fetch the translations of related objects.",
+            ("model",),
+        )
+        self.lookups = Counter(
+            "wagtail_translate_lookups_total",
+            "Lookups of known translations, per store and result.",
+            ("store", "result"),
+        )
+        self.metrics = [
+            self.requests,
+            self.segments,
+            self.characters,
+            self.request_duration,
+            self.batch_duration,
+            self.field_duration,
+            self.block_duration,
+            self.related_objects,
+            self.related_queries,
+            self.lookups,
+        ]
+
+    def translation_requested(
+        self, translator, segments, characters, duration, **kwargs
+    ):
+        labels = get_language_pair(translator)
+        self.requests.inc(**labels)
+        self.segments.inc(segments, **labels)
+        self.characters.inc(characters, **labels)
+        self.request_duration.observe(duration, **labels)
+
+    def segments_translated(self, translator, segments, characters, duration, **kwargs):
+        self.batch_duration.observe(duration, **get_language_pair(translator))
+
+    def field_translated(self, translator, model, field, phase, duration, **kwargs):
+        self.field_duration.observe(
+            duration, model=get_model_label(model), field=field, phase=phase or ""
+        )
+
+    def block_translated(self, translator, block_type, phase, duration, **kwargs):
+        self.block_duration.observe(duration, block_type=block_type, phase=phase or "")
+
+    def related_translations_fetched(
+        self, translator, model, objects, queries, duration, **kwargs
+    ):
+        self.related_objects.inc(objects, model=get_model_label(model))
+        self.related_queries.inc(queries, model=get_model_label(model))
+
+    def translations_looked_up(self, translator, store, hits, misses, **kwargs):
+        self.lookups.inc(hits, store=store, result="hit")
+        self.lookups.inc(misses, store=store, result="miss")
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_sinks = []
+
+
+def connect_sinks() -> None:
+    """
+    Connect sinks, instantiates and connects the sinks of the
+    WAGTAIL_TRANSLATE_METRICS setting. Called when Django starts.
+    """
+    disconnect_sinks()
+    for class_path in getattr(settings, "WAGTAIL_TRANSLATE_METRICS", []):
+        sink = import_string(class_path)()
+        sink.connect()
+        _sinks.append(sink)
+
+
+def disconnect_sinks() -> None:
+    while _sinks:
+        _sinks.pop().disconnect()
+
+
+def get_sink(cls) -> Optional[BaseSink]:
+    """Get sink, returns the connected sink of the given class, or None."""
+    for sink in _sinks:
+        if isinstance(sink, cls):
+            return sink
+    return None
+
+
+@receiver(setting_changed)
+def reconnect_sinks(setting, **kwargs):
+    if setting == "WAGTAIL_TRANSLATE_METRICS":
+        connect_sinks()
+
+
+def metrics_view(request):
+    """
+    Metrics view, exports the metrics of the PrometheusSink
+    in the Prometheus text format.
+    """
+    sink = get_sink(PrometheusSink)
+    if sink is None:
+        raise Http404("PrometheusSink is not in WAGTAIL_TRANSLATE_METRICS.")
+    return HttpResponse(
+        sink.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,150 @@
+"""
+Translation plans for StreamField block definitions.
+
+A plan is compiled once per block definition. It records what kind of block
+it is, and whether the block, or any of its children, needs translation.
+The translator uses the plan to dispatch, and to skip subtrees without
+translatable blocks, without inspecting the block on every value.
+"""
+
+import logging
+import threading
+
+from typing import Dict, Optional
+
+from wagtail import blocks
+from wagtail.models import TranslatableMixin
+
+
+logger = logging.getLogger(__name__)
+
+# Leaf kinds
+TEXT = "text"
+RICH_TEXT = "rich_text"
+RAW_HTML = "raw_html"
+CHOOSER = "chooser"
+
+# Iterable kinds
+STRUCT = "struct"
+STREAM = "stream"
+LIST = "list"
+
+# Not translatable, like URLBlock, DateBlock, ChoiceBlock, etc.
+SKIP = "skip"
+
+
+class BlockPlan:
+    """
+    Block plan, the translation plan for a block definition.
+
+    - `kind`, one of the kinds above.
+    - `children`, the plans of the child blocks, by name.
+      For a ListBlock, the child block is named "item".
+    - `translatable`, whether the block, or any of its children, needs translation.
+    - `model`, the target model of a chooser block, or None.
+    """
+
+    __slots__ = ("block", "kind", "children", "translatable", "model")
+
+    def __init__(
+        self, block, kind: str, children: Optional[Dict] = None, model=None
+    ) -> None:
+        self.block = block
+        self.kind = kind
+        self.model = model
+        self.children = children or {}
+        if children is None:
+            self.translatable = kind != SKIP
+        else:
+            self.translatable = any(
+                child.translatable for child in self.children.values()
+            )
+
+    def __repr__(self):
+        return f"<BlockPlan {self.block.__class__.__name__} {self.kind}>"
+
+
+def get_chooser_model(block):
+    """
+    Get chooser model, the target model of a chooser block,
+    or None if it can't be resolved.
+    """
+    try:
+        model = block.model_class
+    except (LookupError, ValueError) as e:
+        logger.warning(
+            "The target model of %s can't be resolved: %s", block.__class__.__name__, e
+        )
+        return None
+    return model if isinstance(model, type) else None
+
+
+def get_chooser_kind(model) -> str:
+    """
+    Choosers for translatable models need translation, others are skipped.
+    For example, images and documents are not translatable by default.
+    An unknown model is left to translate_related_object.
+    """
+    if model is not None and not issubclass(model, TranslatableMixin):
+        return SKIP
+    return CHOOSER
+
+
+def compile_block_plan(block) -> BlockPlan:
+    """
+    Compile block plan, walks the block definition.
+
+    Keep in sync with BaseTranslator.translate_block.
+    """
+    if isinstance(block, (blocks.CharBlock, blocks.TextBlock)):
+        # Includes BlockQuoteBlock
+        return BlockPlan(block, TEXT)
+    if isinstance(block, blocks.RichTextBlock):
+        return BlockPlan(block, RICH_TEXT)
+    if isinstance(block, blocks.RawHTMLBlock):
+        return BlockPlan(block, RAW_HTML)
+    if isinstance(block, blocks.ChooserBlock):
+        model = get_chooser_model(block)
+        return BlockPlan(block, get_chooser_kind(model), model=model)
+    if isinstance(block, blocks.StructBlock):
+        children = {
+            name: get_block_plan(child) for name, child in block.child_blocks.items()
+        }
+        return BlockPlan(block, STRUCT, children)
+    if isinstance(block, blocks.StreamBlock):
+        children = {
+            name: get_block_plan(child) for name, child in block.child_blocks.items()
+        }
+        return BlockPlan(block, STREAM, children)
+    if isinstance(block, blocks.ListBlock):
+        return BlockPlan(block, LIST, {"item": get_block_plan(block.child_block)})
+    return BlockPlan(block, SKIP)
+
+
+# Blocks are not hashable, plans are cached by id.
+# The block is kept alongside the plan, so the id can't be reused.
+_plans = {}
+_lock = threading.Lock()
+
+
+def get_block_plan(block) -> BlockPlan:
+    """
+    Get block plan, returns the cached plan of the block definition.
+    """
+    try:
+        cached_block, plan = _plans[id(block)]
+        if cached_block is block:
+            return plan
+    except KeyError:
+        pass
+
+    plan = compile_block_plan(block)
+    with _lock:
+        _plans[id(block)] = (block, plan)
+    return plan
+
+
+def clear_block_plans() -> None:
+    """Clear block plans, for use in tests."""
+    with _lock:
+        _plans.clear()
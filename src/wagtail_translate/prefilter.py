@@ -0,0 +1,125 @@
+"""
+Pre-filter, skips segments that need no translation.
+
+Skipped segments are kept as they are. They are not collected, not looked
+up, and not sent to the translation service, see `BaseTranslator.skip_segment`.
+
+The pre-filter is enabled with all built-in rules. Configure it in your settings:
+
+    WAGTAIL_TRANSLATE_PREFILTER = {
+        # Built-in rules, see RULES.
+        "RULES": ["no_letters", "url", "email", "identifier"],
+        # Regular expressions, segments that match one as a whole are skipped.
+        "PATTERNS": [r"SKU-\\d+"],
+        # Dotted paths to functions that receive a segment,
+        # and return True to skip it.
+        "PREDICATES": ["myapp.translation.is_product_name"],
+    }
+
+Set `WAGTAIL_TRANSLATE_PREFILTER = None` to disable the pre-filter.
+Empty and whitespace-only segments are always skipped.
+"""
+
+import re
+
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+# A letter, in any script.
+LETTER_RE = re.compile(r"[^\W\d_]")
+
+# Built-in rules, regular expressions that match a stripped segment as a whole.
+# `no_letters` is a rule of its own, see `PreFilter.skip`.
+RULES = {
+    # Numbers, prices, numeric dates and times, punctuation, symbols, emoji.
+    "no_letters": None,
+    "url": r"(?:[a-z][a-z0-9+.-]*://|www\.)\S+",
+    "email": r"(?:mailto:)?[\w.+-]+@[\w-]+(?:\.[\w-]+)+",
+    # snake_case, dotted.names, file.ext, camelCase.
+    "identifier": r"[A-Za-z_]\w*(?:[._]\w+)+|[a-z]+(?:[A-Z][a-z0-9]*)+",
+}
+
+DEFAULTS = {
+    "RULES": list(RULES),
+    "PATTERNS": [],
+    "PREDICATES": [],
+}
+
+
+class PreFilter:
+    """
+    Pre-filter, decides whether a segment is skipped.
+
+    The rules and patterns are compiled into a single regular expression.
+    The predicates are called for the segments that pass the regular expression.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[str] = DEFAULTS["RULES"],
+        patterns: Iterable[str] = (),
+        predicates: Iterable[Callable[[str], bool]] = (),
+    ) -> None:
+        rules = list(rules)
+        unknown = set(rules) - set(RULES)
+        if unknown:
+            raise ValueError(f"Unknown pre-filter rules: {', '.join(sorted(unknown))}")
+        self.no_letters = "no_letters" in rules
+        expressions = [RULES[rule] for rule in rules if RULES[rule]]
+        expressions += list(patterns)
+        self.pattern = (
+            re.compile("|".join(f"(?:{e})" for e in expressions))
+            if expressions
+            else None
+        )
+        self.predicates = list(predicates)
+
+    def skip(self, segment: str) -> bool:
+        """
+        Skip, returns True if the segment needs no translation.
+        """
+        segment = segment.strip()
+        if not segment:
+            return True
+        if self.no_letters and not LETTER_RE.search(segment):
+            return True
+        if self.pattern is not None and self.pattern.fullmatch(segment):
+            return True
+        return any(predicate(segment) for predicate in self.predicates)
+
+
+_prefilter = None
+
+
+def get_prefilter() -> Optional[PreFilter]:
+    """
+    Get pre-filter, returns the pre-filter of the WAGTAIL_TRANSLATE_PREFILTER
+    setting, or None if it is disabled.
+    """
+    global _prefilter
+    config = getattr(settings, "WAGTAIL_TRANSLATE_PREFILTER", {})
+    if config is None:
+        return None
+    if _prefilter is None:
+        options = {**DEFAULTS, **config}
+        _prefilter = PreFilter(
+            rules=options["RULES"],
+            patterns=options["PATTERNS"],
+            predicates=[
+                import_string(path) if isinstance(path, str) else path
+                for path in options["PREDICATES"]
+            ],
+        )
+    return _prefilter
+
+
+@receiver(setting_changed)
+def reset_prefilter(setting, **kwargs):
+    global _prefilter
+    if setting == "WAGTAIL_TRANSLATE_PREFILTER":
+        _prefilter = None
@@ -2,3 +2,34 @@ import django.dispatch
 
 
 copy_for_translation_done = django.dispatch.Signal()
+
+# Instrumentation, see `wagtail_translate.metrics`.
+#
+# The sender is the translator class, all signals have a `translator`
+# argument, the translator instance. Durations are in seconds.
+# `phase` is "collect" or "apply" inside a batch, None outside a batch.
+
+# A call to the translation service, see `send_request`.
+# Arguments: translator, segments, characters, duration
+translation_requested = django.dispatch.Signal()
+
+# The missing translations of a batch, `translate_many`,
+# with one or more calls to the translation service.
+# Arguments: translator, segments, characters, duration
+segments_translated = django.dispatch.Signal()
+
+# A field of `translate_obj`.
+# Arguments: translator, model, field, phase, duration
+field_translated = django.dispatch.Signal()
+
+# A StreamField block, including its child blocks.
+# Arguments: translator, block_type, phase, duration
+block_translated = django.dispatch.Signal()
+
+# The translations of related objects, foreign keys and chooser blocks.
+# Arguments: translator, model, objects, queries, duration
+related_translations_fetched = django.dispatch.Signal()
+
+# A lookup of known translations, `store` is "cache" or "memory".
+# Arguments: translator, store, hits, misses
+translations_looked_up = django.dispatch.Signal()
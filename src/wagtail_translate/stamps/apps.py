@@ -0,0 +1,20 @@
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_delete
+
+
+class StampsAppConfig(AppConfig):
+    label = "wagtail_translate_stamps"
+    name = "wagtail_translate.stamps"
+    verbose_name = "Wagtail Translate source stamps"
+    default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        from wagtail.models import TranslatableMixin
+
+        from .signals import delete_source_stamp
+
+        # Connected per model, a post_delete receiver without a sender
+        # disables Django's fast deletes for all models.
+        for model in apps.get_models():
+            if issubclass(model, TranslatableMixin):
+                post_delete.connect(delete_source_stamp, sender=model)
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:45
+
+import django.db.models.deletion
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("wagtailcore", "0089_log_entry_data_json_null_to_object"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SourceStamp",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("translation_key", models.UUIDField()),
+                ("fingerprint", models.CharField(max_length=16)),
+                ("fields", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "locale",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="wagtailcore.locale",
+                    ),
+                ),
+                (
+                    "source_locale",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="wagtailcore.locale",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="sourcestamp",
+            constraint=models.UniqueConstraint(
+                fields=("translation_key", "locale"), name="unique_source_stamp"
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from typing import Optional
+
+from django.db import models
+
+from ..fingerprints import Fingerprints, hash_value
+
+
+class SourceStampQuerySet(models.QuerySet):
+    def lookup(self, source_obj, target_obj) -> Optional[Fingerprints]:
+        """
+        Lookup, returns the fingerprints of the source that target_obj was
+        translated from, or None. A translation from another source locale
+        doesn't count.
+        """
+        return (
+            self.filter(
+                translation_key=target_obj.translation_key,
+                locale_id=target_obj.locale_id,
+                source_locale_id=source_obj.locale_id,
+            )
+            .values_list("fields", flat=True)
+            .first()
+        )
+
+    def store(self, source_obj, target_obj, fingerprints: Fingerprints) -> None:
+        """Store, records the fingerprints of the source of target_obj."""
+        self.update_or_create(
+            translation_key=target_obj.translation_key,
+            locale_id=target_obj.locale_id,
+            defaults={
+                "source_locale_id": source_obj.locale_id,
+                "fingerprint": hash_value(fingerprints),
+                "fields": fingerprints,
+            },
+        )
+
+
+class SourceStamp(models.Model):
+    """
+    The fingerprints of the source content a translation was made from.
+
+    One per translated object, keyed by translation key and locale.
+    `fingerprint` is the hash of the object, `fields` the hashes per field
+    and StreamField block. See `wagtail_translate.fingerprints`.
+    """
+
+    translation_key = models.UUIDField()
+    locale = models.ForeignKey(
+        "wagtailcore.Locale", on_delete=models.CASCADE, related_name="+"
+    )
+    source_locale = models.ForeignKey(
+        "wagtailcore.Locale", on_delete=models.CASCADE, related_name="+"
+    )
+    fingerprint = models.CharField(max_length=16)
+    fields = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SourceStampQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["translation_key", "locale"],
+                name="unique_source_stamp",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.translation_key} ({self.locale_id}): {self.fingerprint}"
@@ -0,0 +1,13 @@
+from .models import SourceStamp
+
+
+def delete_source_stamp(sender, instance, **kwargs):
+    """
+    Delete source stamp, when a translation is deleted. A new translation
+    in the same locale starts from an untranslated copy.
+
+    Connected per translatable model, see `StampsAppConfig.ready`.
+    """
+    SourceStamp.objects.filter(
+        translation_key=instance.translation_key, locale_id=instance.locale_id
+    ).delete()
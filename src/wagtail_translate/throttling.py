@@ -0,0 +1,280 @@
+"""
+Throttling, rate limits and retries for calls to translation services.
+
+Rate limit, a budget of requests and characters per second, shared between
+processes through a Django cache backend (use a shared backend, like redis
+or memcached, for multiple servers or workers):
+
+    WAGTAIL_TRANSLATE_RATE_LIMIT = {
+        "REQUESTS_PER_SECOND": 10,  # None for no limit
+        "CHARACTERS_PER_SECOND": 50000,  # None for no limit
+        "BACKEND": "default",  # Django cache alias
+    }
+
+Retry, transient errors, like "429 Too Many Requests", are retried with
+a jittered exponential backoff. A `Retry-After` is honoured:
+
+    WAGTAIL_TRANSLATE_RETRY = {
+        "ATTEMPTS": 5,  # 1 disables retries
+        "BASE_DELAY": 0.5,  # Seconds
+        "MAX_DELAY": 30,  # Seconds
+    }
+
+Both apply to `BaseTranslator.send_request`, and to
+`AsyncBaseTranslator.asend_request` for async translators.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+from typing import Awaitable, Callable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DEFAULTS = {
+    "REQUESTS_PER_SECOND": None,
+    "CHARACTERS_PER_SECOND": None,
+    "BACKEND": "default",
+}
+
+RETRY_DEFAULTS = {
+    "ATTEMPTS": 5,
+    "BASE_DELAY": 0.5,
+    "MAX_DELAY": 30,
+}
+
+KEY_PREFIX = "wagtail_translate:rate"
+
+
+class TransientError(Exception):
+    """
+    Transient error, raise it from a translator to retry the request.
+    Set `retry_after`, in seconds, if the service says when to retry.
+    """
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Rate limiter, a budget of requests and characters per second.
+
+    The budget is counted per second, in the cache, with atomic increments.
+    All processes with the same cache backend and key share the budget.
+    A request that does not fit waits for the next second.
+    """
+
+    sleep = staticmethod(time.sleep)
+    asleep = staticmethod(asyncio.sleep)
+    clock = staticmethod(time.time)
+
+    def __init__(
+        self,
+        key: str,
+        requests_per_second: Optional[int] = None,
+        characters_per_second: Optional[int] = None,
+        backend: str = "default",
+    ) -> None:
+        self.key = key
+        self.requests_per_second = requests_per_second
+        self.characters_per_second = characters_per_second
+        self.backend = backend
+
+    def acquire(self, characters: int = 0) -> None:
+        """
+        Acquire, waits until the request fits in the budget.
+
+        A single request with more characters than the budget is let through
+        at the start of a second, otherwise it would never fit.
+        """
+        while True:
+            now = self.clock()
+            window = int(now)
+            if self.try_acquire(window, characters):
+                return
+            self.sleep(window + 1 - now + random.uniform(0, 0.05))  # noqa: S311
+
+    async def aacquire(self, characters: int = 0) -> None:
+        """
+        Acquire, for use in async code. Waits with `asyncio.sleep`.
+        """
+        try_acquire = sync_to_async(self.try_acquire, thread_sensitive=False)
+        while True:
+            now = self.clock()
+            window = int(now)
+            if await try_acquire(window, characters):
+                return
+            await self.asleep(window + 1 - now + random.uniform(0, 0.05))  # noqa: S311
+
+    def try_acquire(self, window: int, characters: int) -> bool:
+        """
+        Try acquire, takes the request from the budget of the window.
+
+        Returns False if it does not fit. A rejected request takes nothing,
+        its increments are undone.
+        """
+        taken = []
+        fits = True
+        if self.requests_per_second:
+            taken.append(("requests", 1))
+            fits = self.increment(window, "requests", 1) <= self.requests_per_second
+        if fits and self.characters_per_second and characters:
+            taken.append(("characters", characters))
+            used = self.increment(window, "characters", characters)
+            fits = used <= self.characters_per_second or used == characters
+        if not fits:
+            for name, amount in taken:
+                self.decrement(window, name, amount)
+        return fits
+
+    def increment(self, window: int, name: str, amount: int) -> int:
+        cache = caches[self.backend]
+        key = f"{KEY_PREFIX}:{self.key}:{window}:{name}"
+        # The counter expires a few seconds after its window.
+        cache.add(key, 0, timeout=5)
+        try:
+            return cache.incr(key, amount)
+        except ValueError:
+            # Expired in between, start over.
+            cache.add(key, amount, timeout=5)
+            return amount
+
+    def decrement(self, window: int, name: str, amount: int) -> None:
+        cache = caches[self.backend]
+        key = f"{KEY_PREFIX}:{self.key}:{window}:{name}"
+        try:
+            cache.decr(key, amount)
+        except ValueError:
+            # Expired, nothing to undo.
+            pass
+
+
+_rate_limiters = {}
+
+
+def get_rate_limiter(key: str) -> Optional[RateLimiter]:
+    """
+    Get rate limiter, returns the rate limiter for the key,
+    or None if WAGTAIL_TRANSLATE_RATE_LIMIT is not set.
+    """
+    config = getattr(settings, "WAGTAIL_TRANSLATE_RATE_LIMIT", None)
+    if config is None:
+        return None
+    if key not in _rate_limiters:
+        options = {**RATE_LIMIT_DEFAULTS, **config}
+        _rate_limiters[key] = RateLimiter(
+            key,
+            requests_per_second=options["REQUESTS_PER_SECOND"],
+            characters_per_second=options["CHARACTERS_PER_SECOND"],
+            backend=options["BACKEND"],
+        )
+    return _rate_limiters[key]
+
+
+@receiver(setting_changed)
+def reset_rate_limiters(setting, **kwargs):
+    if setting == "WAGTAIL_TRANSLATE_RATE_LIMIT":
+        _rate_limiters.clear()
+
+
+def get_retry_delay(
+    attempt: int, base_delay: float, max_delay: float, retry_after=None
+) -> float:
+    """
+    Get retry delay, exponential backoff with full jitter.
+    If the service sent a Retry-After, wait at least that long.
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))  # noqa: S311
+    if retry_after is not None:
+        delay = max(delay, float(retry_after))
+    return delay
+
+
+def get_retry_options(
+    attempts: Optional[int], base_delay: Optional[float], max_delay: Optional[float]
+) -> Tuple[int, float, float]:
+    """
+    Get retry options, the given options, defaulting to
+    the WAGTAIL_TRANSLATE_RETRY setting.
+    """
+    options = {**RETRY_DEFAULTS, **getattr(settings, "WAGTAIL_TRANSLATE_RETRY", {})}
+    return (
+        options["ATTEMPTS"] if attempts is None else attempts,
+        options["BASE_DELAY"] if base_delay is None else base_delay,
+        options["MAX_DELAY"] if max_delay is None else max_delay,
+    )
+
+
+def get_backoff(
+    error: Exception, attempt: int, base_delay: float, max_delay: float
+) -> float:
+    """
+    Get backoff, logs the failed attempt, and returns the delay
+    before the next attempt.
+    """
+    delay = get_retry_delay(
+        attempt, base_delay, max_delay, getattr(error, "retry_after", None)
+    )
+    logger.warning("Translation request failed (%s), retrying in %.1fs.", error, delay)
+    return delay
+
+
+def retry(
+    func: Callable,
+    is_transient: Callable[[Exception], bool],
+    attempts: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
+    sleep: Optional[Callable[[float], None]] = None,
+):
+    """
+    Retry, calls `func`, and retries it on transient errors.
+
+    The options default to the WAGTAIL_TRANSLATE_RETRY setting.
+    The last error is raised when all attempts fail.
+    """
+    attempts, base_delay, max_delay = get_retry_options(attempts, base_delay, max_delay)
+    sleep = sleep or time.sleep
+
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception as e:
+            if attempt + 1 >= attempts or not is_transient(e):
+                raise
+            sleep(get_backoff(e, attempt, base_delay, max_delay))
+
+
+async def aretry(
+    func: Callable[[], Awaitable],
+    is_transient: Callable[[Exception], bool],
+    attempts: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
+    sleep: Optional[Callable[[float], Awaitable]] = None,
+):
+    """
+    Retry, for use in async code. Awaits `func`, and waits with `asyncio.sleep`.
+    See `retry`.
+    """
+    attempts, base_delay, max_delay = get_retry_options(attempts, base_delay, max_delay)
+    sleep = sleep or asyncio.sleep
+
+    for attempt in range(attempts):
+        try:
+            return await func()
+        except Exception as e:
+            if attempt + 1 >= attempts or not is_transient(e):
+                raise
+            await sleep(get_backoff(e, attempt, base_delay, max_delay))
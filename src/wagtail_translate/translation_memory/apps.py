@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class TranslationMemoryAppConfig(AppConfig):
+    label = "wagtail_translate_translation_memory"
+    name = "wagtail_translate.translation_memory"
+    verbose_name = "Wagtail Translate translation memory"
+    default_auto_field = "django.db.models.BigAutoField"
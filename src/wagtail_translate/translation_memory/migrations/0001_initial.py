@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="TranslationMemory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source_language_code", models.CharField(max_length=100)),
+                ("target_language_code", models.CharField(max_length=100)),
+                ("source_hash", models.CharField(max_length=64)),
+                ("source_string", models.TextField()),
+                ("translation", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "translation memory",
+                "verbose_name_plural": "translation memory",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="translationmemory",
+            constraint=models.UniqueConstraint(
+                fields=("source_language_code", "target_language_code", "source_hash"),
+                name="unique_translation_memory",
+            ),
+        ),
+    ]
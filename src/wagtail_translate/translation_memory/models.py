@@ -0,0 +1,99 @@
+import hashlib
+
+from typing import Dict, List
+
+from django.db import models
+
+
+# Keeps the number of query parameters well below the SQLite limit.
+LOOKUP_BATCH_SIZE = 500
+
+
+def get_source_hash(source_string: str) -> str:
+    return hashlib.sha256(source_string.encode("utf-8")).hexdigest()
+
+
+class TranslationMemoryQuerySet(models.QuerySet):
+    def lookup(
+        self,
+        source_language_code: str,
+        target_language_code: str,
+        source_strings: List[str],
+    ) -> Dict[str, str]:
+        """
+        Lookup, returns a dictionary of source strings and their stored translations.
+
+        Strings without a stored translation are left out.
+        Runs one query per `LOOKUP_BATCH_SIZE` unique strings.
+        """
+        hashes = {get_source_hash(s): s for s in source_strings}
+        translations = {}
+        hash_list = list(hashes)
+        for i in range(0, len(hash_list), LOOKUP_BATCH_SIZE):
+            entries = self.filter(
+                source_language_code=source_language_code,
+                target_language_code=target_language_code,
+                source_hash__in=hash_list[i : i + LOOKUP_BATCH_SIZE],
+            ).values_list("source_hash", "source_string", "translation")
+            for source_hash, source_string, translation in entries:
+                # Guard against hash collisions.
+                if hashes[source_hash] == source_string:
+                    translations[source_string] = translation
+        return translations
+
+    def store(
+        self,
+        source_language_code: str,
+        target_language_code: str,
+        translations: Dict[str, str],
+    ) -> None:
+        """
+        Store, saves the translations with a single bulk insert.
+
+        Existing entries are kept as they are.
+        """
+        self.bulk_create(
+            [
+                self.model(
+                    source_language_code=source_language_code,
+                    target_language_code=target_language_code,
+                    source_hash=get_source_hash(source_string),
+                    source_string=source_string,
+                    translation=translation,
+                )
+                for source_string, translation in translations.items()
+            ],
+            batch_size=LOOKUP_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+class TranslationMemory(models.Model):
+    """
+    A translated string, stored for reuse.
+
+    Looked up by source language, target language, and the SHA-256 hash
+    of the source string.
+    """
+
+    source_language_code = models.CharField(max_length=100)
+    target_language_code = models.CharField(max_length=100)
+    source_hash = models.CharField(max_length=64)
+    source_string = models.TextField()
+    translation = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TranslationMemoryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "translation memory"
+        verbose_name_plural = "translation memory"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_language_code", "target_language_code", "source_hash"],
+                name="unique_translation_memory",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_language_code} → {self.target_language_code}: {self.source_string[:50]}"
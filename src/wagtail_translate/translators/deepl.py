@@ -1,12 +1,118 @@
+import asyncio
+import hashlib
+import re
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
 import deepl
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
-from .base import BaseTranslator
+from ..html_engines import SKIPPED, START_TAG, StreamingHTMLEngine
+from .base import AsyncBaseTranslator, BaseTranslator, chunk_strings
+
+
+# DeepL request limits, see https://developers.deepl.com/docs/resources/usage-limits
+# At most 50 texts per request, and a total request size of at most 128 KiB.
+# The size limit is kept below 128 KiB, to leave room for the other parameters.
+MAX_TEXTS_PER_REQUEST = 50
+MAX_REQUEST_SIZE = 120 * 1024
+
+
+@lru_cache(maxsize=None)
+def get_client(auth_key: str) -> deepl.Translator:
+    """
+    Get client, returns the DeepL client for the given auth key.
+
+    The client is created once per process, and shared between translators.
+    It holds a connection pooled HTTP session, so consecutive requests
+    skip the connection setup and TLS handshake.
+    """
+    return deepl.Translator(auth_key)
+
+
+class HTMLSegment(str):
+    """HTML segment, a string that DeepL translates as HTML, see `tag_handling`."""
+
+
+# Wagtail stores links and embeds as entities, for example:
+# <a linktype="page" id="3"> and <embed embedtype="image" id="1" format="left"/>
+# DeepL must not touch them, they are replaced by placeholder tags.
+ENTITY_ATTRIBUTES = {"a": "linktype", "embed": "embedtype"}
+PLACEHOLDER_ATTRIBUTE = "data-wagtail-translate"
+PLACEHOLDER_RE = re.compile(
+    rf"""<(a|embed)\s[^>]*?{PLACEHOLDER_ATTRIBUTE}\s*=\s*["']?(\d+)["']?[^>]*>"""
+)
+
+
+def protect_entities(
+    html: str, translate_attribute, attributes, cache: Optional[dict] = None
+) -> Tuple[str, Dict[int, str]]:
+    """
+    Protect entities, replaces Wagtail's link and embed entities by placeholders.
+    Elements that are not translated, like `<code>`, are replaced as a whole,
+    see `wagtail_translate.html_engines.skip_subtrees`.
+
+    Returns the protected HTML, and the markup of the entities by number.
+    The title and alt attributes of the entities are translated.
+    The tokens are kept in `cache`, see `wagtail_translate.html_engines`.
+    """
+    engine = StreamingHTMLEngine()
+    parts = []
+    entities = {}
+    position = 0
+    for token in engine.get_tokens(html, cache):
+        if token.kind == SKIPPED:
+            number = len(entities) + 1
+            entities[number] = html[token.start : token.end]
+            parts.append(html[position : token.start])
+            parts.append(f'<embed {PLACEHOLDER_ATTRIBUTE}="{number}"/>')
+            position = token.end
+            continue
+        if token.kind != START_TAG or token.tag not in ENTITY_ATTRIBUTES:
+            continue
+        if not any(a.name == ENTITY_ATTRIBUTES[token.tag] for a in token.attrs):
+            continue
+        number = len(entities) + 1
+        entities[number] = engine.translate_tag(
+            html, token, translate_attribute, attributes
+        )
+        self_closing = "/" if token.tag == "embed" else ""
+        parts.append(html[position : token.start])
+        parts.append(f'<{token.tag} {PLACEHOLDER_ATTRIBUTE}="{number}"{self_closing}>')
+        position = token.end
+    parts.append(html[position:])
+    return "".join(parts), entities
+
+
+def restore_entities(html: str, entities: Dict[int, str]) -> Optional[str]:
+    """
+    Restore entities, replaces the placeholders by the entities.
+
+    Returns None if a placeholder is missing, duplicated, or unknown.
+    """
+    seen = set()
+
+    def replace(match):
+        number = int(match.group(2))
+        seen.add(number)
+        return entities.get(number, "")
+
+    restored = PLACEHOLDER_RE.sub(replace, html)
+    if seen != set(entities) or len(PLACEHOLDER_RE.findall(html)) != len(entities):
+        return None
+    return restored
 
 
 class DeepLTranslator(BaseTranslator):
+    # Set to "html" to let DeepL translate HTML (rich text and raw HTML) itself.
+    # Each HTML value is sent as a single string, instead of a string per
+    # text node. Defaults to the WAGTAIL_TRANSLATE_DEEPL_TAG_HANDLING setting.
+    tag_handling = None
+
     def __init__(self, source_language_code: str, target_language_code: str) -> None:
         if hasattr(settings, "WAGTAIL_TRANSLATE_DEEPL_KEY"):
             self.auth_key = settings.WAGTAIL_TRANSLATE_DEEPL_KEY
@@ -14,19 +120,151 @@ class DeepLTranslator(BaseTranslator):
             raise ImproperlyConfigured(
                 "Please set WAGTAIL_TRANSLATE_DEEPL_KEY in your settings file."
             )
+        self.tag_handling = getattr(
+            settings, "WAGTAIL_TRANSLATE_DEEPL_TAG_HANDLING", self.tag_handling
+        )
         super().__init__(source_language_code, target_language_code)
 
+    @property
+    def client(self) -> deepl.Translator:
+        return get_client(self.auth_key)
+
     def translate(self, source_string: str) -> str:
         """
         Translate, a function that does the actual translation.
         The translation service is provided by the DeepL service.
         """
-        translator = deepl.Translator(self.auth_key)
-        if source_string == "":
-            return ""
-        translation = translator.translate_text(
-            source_string,
+        return self.translate_many([source_string])[0]
+
+    def translate_many(self, source_strings: List[str]) -> List[str]:
+        """
+        Translate many, sends the strings to DeepL in as few requests as possible.
+
+        Empty strings are not sent, DeepL rejects them.
+        """
+        indices, chunks = self.split_requests(source_strings)
+        translated = []
+        for chunk in chunks:
+            translated.extend(self.translate_chunk(chunk))
+        return self.merge_translations(source_strings, indices, translated)
+
+    def split_requests(self, source_strings: List[str]):
+        """
+        Split requests, splits the non-empty strings into chunks.
+
+        Text and HTML segments are sent in separate requests, as the
+        `tag_handling` option applies to the whole request.
+        Returns the indices of the sent strings, in the order of the chunks,
+        and the chunks.
+        """
+        pending = [i for i, s in enumerate(source_strings) if s]
+        texts = [i for i in pending if not isinstance(source_strings[i], HTMLSegment)]
+        html = [i for i in pending if isinstance(source_strings[i], HTMLSegment)]
+        chunks = [
+            *chunk_strings(
+                [source_strings[i] for i in texts],
+                MAX_TEXTS_PER_REQUEST,
+                MAX_REQUEST_SIZE,
+            ),
+            *chunk_strings(
+                [source_strings[i] for i in html],
+                MAX_TEXTS_PER_REQUEST,
+                MAX_REQUEST_SIZE,
+            ),
+        ]
+        return texts + html, chunks
+
+    def translate_chunk(self, chunk: List[str]) -> List[str]:
+        """
+        Translate chunk, sends a single request to DeepL.
+        """
+        options = {}
+        if isinstance(chunk[0], HTMLSegment):
+            options["tag_handling"] = self.tag_handling
+        results = self.send_request(
+            self.client.translate_text,
+            chunk,
+            segments=len(chunk),
+            characters=sum(len(s) for s in chunk),
             source_lang=self.source_language_code,
             target_lang=self.target_language_code,
+            **options,
+        )
+        return [result.text for result in results]
+
+    @property
+    def rate_limit_key(self) -> str:
+        """Rate limit key, the translators of a DeepL account share the limit."""
+        return "deepl:" + hashlib.sha256(self.auth_key.encode()).hexdigest()[:16]
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """
+        Is transient error, retries "429 Too many requests", "456 Quota exceeded"
+        and connection errors. The DeepL client does not expose a Retry-After.
+        """
+        return super().is_transient_error(error) or isinstance(
+            error,
+            (
+                deepl.TooManyRequestsException,
+                deepl.QuotaExceededException,
+                deepl.ConnectionException,
+            ),
         )
-        return translation.text
+
+    @staticmethod
+    def merge_translations(
+        source_strings: List[str], indices: List[int], translated: List[str]
+    ) -> List[str]:
+        """
+        Merge translations, puts the translations in the order of the source strings.
+        Strings that were not sent, the empty strings, are returned as is.
+        """
+        translations = list(source_strings)
+        for index, translation in zip(indices, translated):
+            translations[index] = translation
+        return translations
+
+    def translate_html(self, html: str) -> str:
+        """
+        Translate HTML, with `tag_handling` set, DeepL translates the HTML.
+
+        The HTML is sent as a single segment, with Wagtail's link and embed
+        entities protected. If the entities do not survive the translation,
+        the HTML is translated text node by text node.
+        """
+        if not self.tag_handling or not html.strip():
+            return super().translate_html(html)
+
+        protected, entities = protect_entities(
+            html, self.translate_attribute, self.translatable_attributes, self._tokens
+        )
+        translation = self.translate_segment(HTMLSegment(protected))
+        restored = restore_entities(translation, entities)
+        if restored is None:
+            return super().translate_html(html)
+        return restored
+
+
+class AsyncDeepLTranslator(AsyncBaseTranslator, DeepLTranslator):
+    """
+    Async DeepL translator, sends the requests of a batch concurrently.
+
+    The DeepL client is synchronous, each request runs in a thread.
+    At most `max_concurrency` requests are in flight.
+    """
+
+    async def atranslate(self, source_string: str) -> str:
+        return (await self.atranslate_many([source_string]))[0]
+
+    async def atranslate_many(self, source_strings: List[str]) -> List[str]:
+        indices, chunks = self.split_requests(source_strings)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        translate_chunk = sync_to_async(self.translate_chunk, thread_sensitive=False)
+
+        async def atranslate_chunk(chunk):
+            async with semaphore:
+                return await translate_chunk(chunk)
+
+        results = await asyncio.gather(*map(atranslate_chunk, chunks))
+        translated = [translation for result in results for translation in result]
+        return self.merge_translations(source_strings, indices, translated)
@@ -0,0 +1,241 @@
+"""
+HTTP translators, for translation services with a JSON API.
+
+- `HTTPTranslator`, LibreTranslate style, `POST /translate`.
+- `OpenAITranslator`, OpenAI style chat completions, `POST /v1/chat/completions`.
+
+Configure the service in your settings:
+
+    WAGTAIL_TRANSLATE_TRANSLATOR = "wagtail_translate.translators.http.HTTPTranslator"
+    WAGTAIL_TRANSLATE_HTTP = {
+        "URL": "http://localhost:5000/translate",
+        "API_KEY": "",
+        "TIMEOUT": (3.05, 30),  # Connect and read timeout, in seconds.
+        "POOL_SIZE": 10,  # Keep-alive connections per host, per process.
+        "MAX_TEXTS_PER_REQUEST": 50,
+        "MAX_REQUEST_SIZE": 100 * 1024,  # Bytes of text per request.
+        "HEADERS": {},  # Extra request headers.
+        "MODEL": "",  # OpenAITranslator only.
+    }
+
+For another service, subclass `HTTPTranslator`, and override
+`get_request_body` and `parse_response`.
+"""
+
+import json
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import List, Optional
+
+import requests
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+
+from ..throttling import TransientError
+from .base import BaseTranslator, chunk_strings
+
+
+@lru_cache(maxsize=None)
+def get_session(pool_size: int) -> requests.Session:
+    """
+    Get session, returns the HTTP session for the given pool size.
+
+    The session is created once per process, and shared between translators.
+    Its connections are kept alive, so consecutive requests skip the
+    connection setup and TLS handshake. Retries are left to `send_request`.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_retry_after(response: requests.Response) -> Optional[float]:
+    """
+    Get retry after, returns the Retry-After header in seconds, or None.
+    The header is a number of seconds, or an HTTP date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class HTTPTranslator(BaseTranslator):
+    """
+    HTTP translator, for LibreTranslate style services.
+
+    The class attributes are the defaults of the WAGTAIL_TRANSLATE_HTTP setting.
+    """
+
+    url = None
+    api_key = ""
+    timeout = (3.05, 30)
+    pool_size = 10
+    max_texts_per_request = 50
+    max_request_size = 100 * 1024
+    headers = {}
+
+    # Responses with these status codes are retried,
+    # after the Retry-After of the response, see `send_request`.
+    transient_status_codes = (429, 502, 503, 504)
+
+    def __init__(self, source_language_code: str, target_language_code: str) -> None:
+        options = getattr(settings, "WAGTAIL_TRANSLATE_HTTP", {})
+        for name in (
+            "url",
+            "api_key",
+            "timeout",
+            "pool_size",
+            "max_texts_per_request",
+            "max_request_size",
+            "headers",
+        ):
+            setattr(self, name, options.get(name.upper(), getattr(self, name)))
+        if not self.url:
+            raise ImproperlyConfigured(
+                "Please set WAGTAIL_TRANSLATE_HTTP['URL'] in your settings file."
+            )
+        super().__init__(source_language_code, target_language_code)
+
+    @property
+    def session(self) -> requests.Session:
+        return get_session(self.pool_size)
+
+    def translate(self, source_string: str) -> str:
+        return self.translate_many([source_string])[0]
+
+    def translate_many(self, source_strings: List[str]) -> List[str]:
+        """
+        Translate many, sends the strings in as few requests as the limits allow.
+        Empty strings are not sent.
+        """
+        indices = [i for i, source_string in enumerate(source_strings) if source_string]
+        translated = []
+        for chunk in chunk_strings(
+            [source_strings[i] for i in indices],
+            self.max_texts_per_request,
+            self.max_request_size,
+        ):
+            translated.extend(
+                self.send_request(
+                    self.post,
+                    chunk,
+                    segments=len(chunk),
+                    characters=sum(len(s) for s in chunk),
+                )
+            )
+
+        translations = list(source_strings)
+        for index, translation in zip(indices, translated):
+            translations[index] = translation
+        return translations
+
+    def post(self, chunk: List[str]) -> List[str]:
+        """
+        Post, sends a single request, and returns the translations.
+        """
+        response = self.session.post(
+            self.url,
+            json=self.get_request_body(chunk),
+            headers=self.get_headers(),
+            timeout=self.timeout,
+        )
+        if response.status_code in self.transient_status_codes:
+            raise TransientError(
+                f"{response.status_code} {response.reason}",
+                retry_after=get_retry_after(response),
+            )
+        response.raise_for_status()
+        translations = self.parse_response(response.json())
+        if len(translations) != len(chunk):
+            raise ValueError(
+                f"Expected {len(chunk)} translations, got {len(translations)}."
+            )
+        return translations
+
+    def get_headers(self) -> dict:
+        return dict(self.headers)
+
+    def get_request_body(self, chunk: List[str]) -> dict:
+        """Get request body, a LibreTranslate request."""
+        body = {
+            "q": chunk,
+            "source": self.source_language_code,
+            "target": self.target_language_code,
+            "format": "text",
+        }
+        if self.api_key:
+            body["api_key"] = self.api_key
+        return body
+
+    def parse_response(self, data) -> List[str]:
+        """Parse response, the translations of a LibreTranslate response."""
+        return data["translatedText"]
+
+    @property
+    def rate_limit_key(self) -> str:
+        """Rate limit key, the translators of a service share the limit."""
+        return f"http:{self.url}"
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """Is transient error, also retries connection errors and timeouts."""
+        return super().is_transient_error(error) or isinstance(
+            error, (requests.ConnectionError, requests.Timeout)
+        )
+
+
+class OpenAITranslator(HTTPTranslator):
+    """
+    OpenAI translator, for OpenAI compatible chat completion endpoints.
+
+    The strings of a request are sent as a JSON array, and the model
+    is asked to reply with a JSON array of the translations.
+    """
+
+    model = ""
+    prompt = (
+        "Translate each string in the JSON array from {source} to {target}. "
+        "Keep the leading and trailing whitespace of each string. "
+        "Reply with a JSON array of the translations only, in the same order."
+    )
+
+    def __init__(self, source_language_code: str, target_language_code: str) -> None:
+        options = getattr(settings, "WAGTAIL_TRANSLATE_HTTP", {})
+        self.model = options.get("MODEL", self.model)
+        super().__init__(source_language_code, target_language_code)
+
+    def get_headers(self) -> dict:
+        headers = super().get_headers()
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def get_request_body(self, chunk: List[str]) -> dict:
+        prompt = self.prompt.format(
+            source=self.source_language_code, target=self.target_language_code
+        )
+        return {
+            "model": self.model,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": json.dumps(chunk, ensure_ascii=False)},
+            ],
+        }
+
+    def parse_response(self, data) -> List[str]:
+        return json.loads(data["choices"][0]["message"]["content"])
@@ -0,0 +1,195 @@
+"""
+HTTP server, a local stand-in for a translation service.
+For tests, benchmarks and development, it needs no network access.
+
+Serves the endpoints of `HTTPTranslator` and `OpenAITranslator`:
+
+- `POST /translate`, LibreTranslate style.
+- `POST /v1/chat/completions`, OpenAI style, the strings are a JSON array.
+
+The strings are translated with ROT13, or echoed. Run it from the command line:
+
+    python -m wagtail_translate.translators.http_server --port 5000
+
+Or start it in a test, on a free port:
+
+    with StandInServer(backend="rot13") as server:
+        settings.WAGTAIL_TRANSLATE_HTTP = {"URL": f"{server.url}/translate"}
+        ...
+"""
+
+import argparse
+import codecs
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+BACKENDS = {
+    "rot13": lambda source_string: codecs.encode(source_string, "rot13"),
+    "echo": lambda source_string: source_string,
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1, connections are kept alive between requests.
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, body))
+            failure = server.failures.pop(0) if server.failures else None
+
+        if failure is not None:
+            status, retry_after = failure
+            headers = {} if retry_after is None else {"Retry-After": str(retry_after)}
+            return self.send_json(status, {"error": "Stand-in failure"}, headers)
+        if server.api_key and server.api_key not in (
+            body.get("api_key"),
+            self.headers.get("Authorization", "").replace("Bearer ", ""),
+        ):
+            return self.send_json(403, {"error": "Invalid API key"})
+        if server.latency:
+            time.sleep(server.latency)
+
+        if self.path == "/translate":
+            self.send_json(200, {"translatedText": self.translate(body["q"])})
+        elif self.path == "/v1/chat/completions":
+            source_strings = json.loads(body["messages"][-1]["content"])
+            content = json.dumps(self.translate(source_strings), ensure_ascii=False)
+            self.send_json(
+                200,
+                {
+                    "object": "chat.completion",
+                    "model": body.get("model", ""),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                },
+            )
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def translate(self, source_strings):
+        translate = BACKENDS[self.server.backend]
+        if isinstance(source_strings, str):
+            return translate(source_strings)
+        return [translate(source_string) for source_string in source_strings]
+
+    def send_json(self, status: int, data, headers=None) -> None:
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Stand-in server, a translation service on localhost.
+
+    - `requests`, the received requests, a list of (path, body) tuples.
+    - `connections`, the number of accepted connections.
+    - `fail`, queues error responses, to test retries.
+    - `latency`, seconds to wait before each response.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        backend: str = "rot13",
+        latency: float = 0,
+        api_key: Optional[str] = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__((host, port), StandInHandler)
+        self.backend = backend
+        self.latency = latency
+        self.api_key = api_key
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.requests = []
+        self.connections = 0
+        self.failures = []
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail(self, status: int = 429, retry_after=None, times: int = 1) -> None:
+        """Fail, responds to the next `times` requests with an error."""
+        with self.lock:
+            self.failures.extend([(status, retry_after)] * times)
+
+    def start(self) -> "StandInServer":
+        """Start, serves requests in a background thread."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="rot13")
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--api-key")
+    args = parser.parse_args(argv)
+
+    server = StandInServer(
+        args.host,
+        args.port,
+        backend=args.backend,
+        latency=args.latency,
+        api_key=args.api_key,
+        verbose=True,
+    )
+    print(f"Serving a {args.backend} translation service on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,32 @@
 import pytest
 
+from tests.factories import RecordingTranslator
+
 
 @pytest.fixture(autouse=True)
 def temporary_media_dir(settings, tmp_path: pytest.TempdirFactory):
     settings.MEDIA_ROOT = tmp_path / "media"
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    """A separate locmem cache backend, returns its alias."""
+    settings.CACHES = {
+        **settings.CACHES,
+        "translations": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "wagtail-translate-tests",
+        },
+    }
+    yield "translations"
+    from django.core.cache import caches
+
+    caches["translations"].clear()
+
+
+@pytest.fixture
+def recording_translator(settings):
+    """Use the RecordingTranslator, returns the class."""
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = "tests.factories.RecordingTranslator"
+    RecordingTranslator.sent = []
+    return RecordingTranslator
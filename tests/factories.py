@@ -1,3 +1,5 @@
+import uuid
+
 import factory
 import wagtail_factories
 
@@ -7,6 +9,7 @@ from wagtail.images import get_image_model_string
 from wagtail.models import Locale, Page
 
 from tests.testapp.models import BlogPostPage
+from wagtail_translate.translators.rot13 import ROT13Translator
 
 
 class LocaleFactory(factory.django.DjangoModelFactory):
@@ -37,3 +40,41 @@ class BlogPostPageFactory(wagtail_factories.PageFactory):
     @factory.lazy_attribute
     def parent(self):
         return Page.get_first_root_node()
+
+
+class RecordingTranslator(ROT13Translator):
+    """
+    ROT13, records the batches it sends. `batches` per instance, `sent` for
+    all instances, see the `recording_translator` fixture.
+    """
+
+    use_translation_memory = False
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def translate_many(self, source_strings):
+        self.batches.append(list(source_strings))
+        RecordingTranslator.sent.append(list(source_strings))
+        return super().translate_many(source_strings)
+
+
+def heading(value):
+    return {"type": "heading", "value": value, "id": str(uuid.uuid4())}
+
+
+def create_translated_page(headings=10, language_code="fr"):
+    """A page with heading blocks, and its translation."""
+    page = BlogPostPageFactory(
+        title="Title",
+        intro="<p>Intro</p>",
+        body=[heading(f"Heading {i}") for i in range(headings)],
+    )
+    page.save_revision()
+    translation = page.copy_for_translation(LocaleFactory(language_code=language_code))
+    return (
+        BlogPostPage.objects.get(pk=page.pk),
+        translation.get_latest_revision_as_object(),
+    )
@@ -0,0 +1,102 @@
+import asyncio
+import codecs
+import time
+
+from unittest import mock
+
+import pytest
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from wagtail_translate.throttling import TransientError
+from wagtail_translate.translators.base import AsyncBaseTranslator
+
+
+class SlowROT13Translator(AsyncBaseTranslator):
+    """ROT13, with the latency of a remote translation service."""
+
+    use_translation_memory = False
+    use_stamps = False
+    latency = 0.05
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.received = []
+
+    async def atranslate(self, source_string: str) -> str:
+        self.received.append(source_string)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return codecs.encode(source_string, "rot13")
+
+
+def test_translate_many_is_concurrent():
+    translator = SlowROT13Translator("en", "fr")
+    translator.max_concurrency = 5
+    source_strings = [f"Text {i}" for i in range(20)]
+
+    start = time.perf_counter()
+    translations = translator.translate_many(source_strings)
+    elapsed = time.perf_counter() - start
+
+    assert translations == [codecs.encode(s, "rot13") for s in source_strings]
+    assert translator.max_in_flight == 5
+    # Sequentially, this takes 20 round trips.
+    assert elapsed < 10 * translator.latency
+
+
+def test_translate():
+    assert SlowROT13Translator("en", "fr").translate("One") == "Bar"
+
+
+@mock.patch("wagtail_translate.throttling.time.sleep")
+def test_transient_errors_are_retried(sleep, settings):
+    settings.WAGTAIL_TRANSLATE_RETRY = {"BASE_DELAY": 0.01}
+
+    class FlakyTranslator(SlowROT13Translator):
+        failures = 1
+
+        async def atranslate(self, source_string):
+            if source_string == "One" and self.failures:
+                self.failures -= 1
+                raise TransientError("Service unavailable")
+            return await super().atranslate(source_string)
+
+    translator = FlakyTranslator("en", "fr")
+    assert translator.translate_many(["One", "Two"]) == ["Bar", "Gjb"]
+    assert translator.failures == 0
+    # The retry waits with asyncio.sleep, the event loop is not blocked.
+    sleep.assert_not_called()
+
+
+def make_target(page):
+    """Make target, an untranslated copy of the page."""
+    target = page.copy_for_translation(LocaleFactory())
+    # The default behaviour translated the copy already.
+    target.title = page.title
+    target.intro = page.intro
+    return target
+
+
+@pytest.mark.django_db
+def test_translate_obj():
+    page = BlogPostPageFactory(title="Title", intro="<p>One <em>Two</em></p>")
+    target = make_target(page)
+    translator = SlowROT13Translator("en", "fr")
+    translator.translate_obj(page, target)
+    assert sorted(translator.received) == ["One", "Title", "Two"]
+    assert target.title == "Gvgyr"
+    assert target.intro == "<p>Bar <em>Gjb</em></p>"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_atranslate_obj():
+    page = BlogPostPageFactory(title="Title")
+    target = make_target(page)
+    translator = SlowROT13Translator("en", "fr")
+    asyncio.run(translator.atranslate_obj(page, target))
+    assert translator.received == ["Title"]
+    assert target.title == "Gvgyr"
@@ -0,0 +1,157 @@
+from unittest import mock
+
+import pytest
+
+from django.core.management import call_command
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory
+from wagtail_translate.background.models import TranslationJob
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def background(settings):
+    settings.WAGTAIL_TRANSLATE_BACKGROUND = True
+
+
+@pytest.fixture
+def copy_for_translation(background, django_capture_on_commit_callbacks):
+    """Copy for translation, and commit, jobs are enqueued on commit."""
+
+    def copy_for_translation(obj):
+        with django_capture_on_commit_callbacks(execute=True):
+            return obj.copy_for_translation(LocaleFactory())
+
+    return copy_for_translation
+
+
+def test_translation_is_deferred(copy_for_translation):
+    page = BlogPostPageFactory(title="Hello")
+    translation = copy_for_translation(page)
+
+    assert translation.title == "Hello"
+    job = TranslationJob.objects.get()
+    assert job.status == TranslationJob.Status.PENDING
+    assert job.get_objects() == (page, translation)
+
+
+def test_job_is_enqueued_on_commit(background, django_capture_on_commit_callbacks):
+    category = BlogCategory.objects.create(name="Hello")
+    with django_capture_on_commit_callbacks() as callbacks:
+        category.copy_for_translation(LocaleFactory())
+        # A worker can't claim a job for a target that is not committed yet.
+        assert not TranslationJob.objects.exists()
+
+    assert len(callbacks) == 1
+
+
+def test_enqueue_is_idempotent(copy_for_translation):
+    category = BlogCategory.objects.create(name="Hello")
+    translation = copy_for_translation(category)
+    TranslationJob.objects.enqueue(category, translation)
+    assert TranslationJob.objects.count() == 1
+
+
+def test_worker_translates_and_saves(copy_for_translation):
+    page = BlogPostPageFactory(title="Hello")
+    translation = copy_for_translation(page)
+    category = BlogCategory.objects.create(name="Hello")
+    category_translation = copy_for_translation(category)
+
+    call_command("translate_worker", "--once")
+
+    assert set(TranslationJob.objects.values_list("status", flat=True)) == {"done"}
+    translation.refresh_from_db()
+    assert translation.get_latest_revision_as_object().title == "Uryyb"
+    category_translation.refresh_from_db()
+    assert category_translation.name == "Uryyb"
+
+
+def test_claim_only_once(copy_for_translation):
+    category = BlogCategory.objects.create(name="Hello")
+    copy_for_translation(category)
+
+    job = TranslationJob.objects.claim()
+    assert job.status == TranslationJob.Status.RUNNING
+    assert job.attempts == 1
+    assert TranslationJob.objects.claim() is None
+
+
+def test_failed_job_is_retried(copy_for_translation, settings):
+    category = BlogCategory.objects.create(name="Hello")
+    copy_for_translation(category)
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = "tests.does.not.Exist"
+
+    job = TranslationJob.objects.claim()
+    job.run(max_attempts=2)
+    assert job.status == TranslationJob.Status.PENDING
+    assert "ModuleNotFoundError" in job.error
+
+    job = TranslationJob.objects.claim()
+    job.run(max_attempts=2)
+    assert job.status == TranslationJob.Status.FAILED
+
+
+def test_failed_job_superseded_while_running(copy_for_translation, settings):
+    category = BlogCategory.objects.create(name="Hello")
+    translation = copy_for_translation(category)
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = "tests.does.not.Exist"
+    job = TranslationJob.objects.claim()
+
+    def is_superseded():
+        # The editor translates again, right after the check.
+        TranslationJob.objects.enqueue(category, translation)
+        return False
+
+    with mock.patch.object(TranslationJob, "is_superseded", side_effect=is_superseded):
+        job.run()
+
+    job.refresh_from_db()
+    assert job.status == TranslationJob.Status.FAILED
+    assert TranslationJob.objects.filter(status="pending").count() == 1
+
+
+def test_stale_jobs_are_requeued(copy_for_translation):
+    category = BlogCategory.objects.create(name="Hello")
+    copy_for_translation(category)
+    TranslationJob.objects.claim()
+
+    assert TranslationJob.objects.requeue_stale(timeout=60) == 0
+    assert TranslationJob.objects.requeue_stale(timeout=-1) == 1
+    assert TranslationJob.objects.get().status == TranslationJob.Status.PENDING
+
+
+def test_stale_job_with_a_pending_job_is_failed(copy_for_translation):
+    category = BlogCategory.objects.create(name="Hello")
+    translation = copy_for_translation(category)
+    stale = TranslationJob.objects.claim()
+    # The editor translates again, while the worker is gone.
+    TranslationJob.objects.enqueue(category, translation)
+
+    assert TranslationJob.objects.requeue_stale(timeout=-1) == 0
+    stale.refresh_from_db()
+    assert stale.status == TranslationJob.Status.FAILED
+    assert TranslationJob.objects.filter(status="pending").count() == 1
+
+    # The worker keeps working.
+    call_command("translate_worker", "--once", "--stale-after=-1")
+    translation.refresh_from_db()
+    assert translation.name == "Uryyb"
+
+
+def test_stale_job_is_not_requeued_forever(copy_for_translation):
+    category = BlogCategory.objects.create(name="Hello")
+    copy_for_translation(category)
+
+    for _ in range(2):
+        TranslationJob.objects.claim()
+        assert TranslationJob.objects.requeue_stale(timeout=-1, max_attempts=3) == 1
+    TranslationJob.objects.claim()
+
+    assert TranslationJob.objects.requeue_stale(timeout=-1, max_attempts=3) == 0
+    job = TranslationJob.objects.get()
+    assert job.status == TranslationJob.Status.FAILED
+    assert job.attempts == 3
@@ -0,0 +1,112 @@
+import uuid
+
+import pytest
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+pytestmark = pytest.mark.django_db
+
+
+class BatchRecordingTranslator(ROT13Translator):
+    use_translation_memory = False
+    use_stamps = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+        self.translate_calls = 0
+
+    def translate(self, source_string: str) -> str:
+        self.translate_calls += 1
+        return super().translate(source_string)
+
+    def translate_many(self, source_strings):
+        self.batches.append(list(source_strings))
+        return super().translate_many(source_strings)
+
+
+def test_translate_many_defaults_to_translate():
+    translator = ROT13Translator("en", "fr")
+    assert translator.translate_many(["One", "Two"]) == ["Bar", "Gjb"]
+
+
+def test_translate_obj_uses_a_single_batch():
+    page = BlogPostPageFactory(
+        title="Title",
+        intro='<p>One <em title="Two">Three</em></p>',
+        body=[
+            {"type": "heading", "value": "Four", "id": str(uuid.uuid4())},
+            {
+                "type": "list",
+                "value": [
+                    {"type": "item", "value": "Five", "id": str(uuid.uuid4())},
+                ],
+                "id": str(uuid.uuid4()),
+            },
+        ],
+    )
+    target = page.copy_for_translation(LocaleFactory())
+    page.refresh_from_db()
+    translator = BatchRecordingTranslator("en", "fr")
+    translator.translate_obj(page, target)
+
+    assert len(translator.batches) == 1
+    assert {"Title", "One", "Three", "Two", "Four", "Five"} <= set(
+        translator.batches[0]
+    )
+    assert target.title == "Gvgyr"
+    assert target.intro == '<p>Bar <em title="Gjb">Guerr</em></p>'
+    assert target.body[0].value == "Sbhe"
+    assert list(target.body[1].value) == ["Svir"]
+
+
+def test_translate_many_must_return_a_translation_per_string():
+    class BrokenTranslator(ROT13Translator):
+        use_translation_memory = False
+        use_stamps = False
+
+        def translate_many(self, source_strings):
+            return []
+
+    page = BlogPostPageFactory(title="Title")
+    target = page.copy_for_translation(LocaleFactory())
+    with pytest.raises(ValueError):
+        BrokenTranslator("en", "fr").translate_obj(page, target)
+
+
+def test_translate_segment_outside_batch():
+    translator = BatchRecordingTranslator("en", "fr")
+    assert translator.translate_html("<p>One</p>") == "<p>Bar</p>"
+    assert translator.batches == [["One"]]
+    assert translator.translate_calls == 1
+
+
+def test_duplicate_strings_are_translated_once():
+    page = BlogPostPageFactory(
+        title="Read more",
+        body=[
+            {"type": "heading", "value": "Read more", "id": str(uuid.uuid4())},
+            {
+                "type": "list",
+                "value": [
+                    {"type": "item", "value": "Item", "id": str(uuid.uuid4())},
+                    {"type": "item", "value": "Item", "id": str(uuid.uuid4())},
+                ],
+                "id": str(uuid.uuid4()),
+            },
+        ],
+    )
+    target = page.copy_for_translation(LocaleFactory())
+    page.refresh_from_db()
+    translator = BatchRecordingTranslator("en", "fr")
+    translator.translate_obj(page, target)
+
+    batch = translator.batches[0]
+    assert len(batch) == len(set(batch))
+    assert batch.count("Read more") == batch.count("Item") == 1
+    assert translator.stats["duplicates"] == translator.stats["segments"] - len(batch)
+    assert translator.stats["duplicates"] >= 2
+    assert target.title == target.body[0].value == "Ernq zber"
+    assert list(target.body[1].value) == ["Vgrz", "Vgrz"]
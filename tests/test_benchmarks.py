@@ -0,0 +1,254 @@
+"""
+Benchmarks, translate synthetic large pages offline.
+
+Measures wall time, translate calls, characters sent, database queries
+and peak memory, and asserts budgets on calls and queries, so regressions
+like N+1 queries fail the test run.
+
+Run with `-s` to see the measurements:
+
+    pytest tests/test_benchmarks.py -s
+
+Set BENCHMARK_SCALE to generate larger pages (default 1, hundreds of blocks,
+10 gives thousands), and BENCHMARK_LATENCY to the latency of a translation
+request in seconds.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.actions.copy_for_translation import CopyPageForTranslationAction
+
+from tests.factories import BlogPostPageFactory, ImageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.default_behaviour.translation import collect_translations
+from wagtail_translate.translators.http import HTTPTranslator
+from wagtail_translate.translators.http_server import StandInServer
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark]
+
+SCALE = int(os.environ.get("BENCHMARK_SCALE", 1))
+LATENCY = float(os.environ.get("BENCHMARK_LATENCY", 0))
+
+
+class MockProvider(ROT13Translator):
+    """ROT13, with the latency of a remote translation service."""
+
+    use_translation_memory = False
+    use_stamps = False
+    latency = LATENCY
+    calls = 0
+    characters = 0
+    lock = threading.Lock()
+
+    def translate_many(self, source_strings):
+        cls = MockProvider
+        with cls.lock:
+            cls.calls += 1
+            cls.characters += sum(len(s) for s in source_strings)
+        if self.latency:
+            time.sleep(self.latency)
+        return super().translate_many(source_strings)
+
+
+class Measurement:
+    """Measurement, the cost of running the code within the block."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        MockProvider.calls = 0
+        MockProvider.characters = 0
+        self.queries = CaptureQueriesContext(connection)
+        self.queries.__enter__()
+        tracemalloc.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_time = time.perf_counter() - self.start
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.queries.__exit__(*exc_info)
+        self.query_count = len(self.queries.captured_queries)
+        self.calls = MockProvider.calls
+        self.characters = MockProvider.characters
+        print(
+            f"\n{self.name}: {self.wall_time * 1000:.1f} ms, "
+            f"{self.calls} calls, {self.characters} characters, "
+            f"{self.query_count} queries, {self.peak_memory / 1024:.0f} KiB peak"
+        )
+
+
+@pytest.fixture
+def mock_provider(settings):
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = "tests.test_benchmarks.MockProvider"
+
+
+@pytest.fixture
+def related_objects():
+    """Categories with and without translations, and an image."""
+    LocaleFactory(language_code="en")
+    locale_fr = LocaleFactory(language_code="fr")
+    categories = [BlogCategory.objects.create(name=f"Category {i}") for i in range(20)]
+    for category in categories[::2]:
+        category.copy_for_translation(locale_fr).save()
+    return categories, ImageFactory()
+
+
+def rich_text(paragraphs):
+    return "".join(
+        f'<p>Paragraph {i} with <strong>bold</strong>, <em title="Emphasis">'
+        f'emphasis</em> and a <a href="https://example.com/{i}">link</a>.</p>'
+        for i in range(paragraphs)
+    )
+
+
+def make_body(size, categories, image):
+    """
+    Make body, returns the raw StreamField data with `size` blocks of each type.
+    """
+
+    def block(block_type, value):
+        return {"type": block_type, "value": value, "id": str(uuid.uuid4())}
+
+    body = []
+    for i in range(size):
+        category = categories[i % len(categories)]
+        body += [
+            block("heading", f"Heading {i}"),
+            block("paragraph", rich_text(5)),
+            block(
+                "stream_nested",
+                [
+                    block("stream", [block("paragraph", f"Nested {i} {j}")])
+                    for j in range(3)
+                ],
+            ),
+            block(
+                "list_nested",
+                [[f"Item {i} {j} {k}" for k in range(3)] for j in range(3)],
+            ),
+            block("struct", {"paragraph": f"Caption {i}", "image": image.pk}),
+            block("raw", f"<div title='Raw {i}'>Raw {i}</div>"),
+            block("snippet", category.pk),
+            block("image_chooser", image.pk),
+            block("heading", "Read more"),
+        ]
+    return body
+
+
+def make_page(size, related_objects, **kwargs):
+    categories, image = related_objects
+    return BlogPostPageFactory(
+        intro=rich_text(20),
+        category=categories[0],
+        image=image,
+        body=make_body(size, categories, image),
+        **kwargs,
+    )
+
+
+def make_translation(size, related_objects):
+    """Make translation, returns a large page and its untranslated copy."""
+    page = make_page(size, related_objects)
+    target = page.copy_for_translation(LocaleFactory(language_code="fr"))
+    return BlogPostPage.objects.get(pk=page.pk), target
+
+
+def test_translate_obj(related_objects):
+    small = make_translation(10 * SCALE, related_objects)
+    large = make_translation(30 * SCALE, related_objects)
+
+    with Measurement("translate_obj, small page") as small_run:
+        MockProvider("en", "fr").translate_obj(*small)
+    with Measurement("translate_obj, large page") as large_run:
+        MockProvider("en", "fr").translate_obj(*large)
+
+    # One request per object, and a fixed number of queries,
+    # independent of the number of blocks.
+    assert small_run.calls == large_run.calls == 1
+    assert small_run.query_count == large_run.query_count
+    assert large_run.query_count <= 10
+
+
+def test_translate_obj_raw(related_objects):
+    materialized = make_translation(30 * SCALE, related_objects)
+    raw = make_translation(30 * SCALE, related_objects)
+
+    with Measurement("translate_obj, materialized StreamField") as materialized_run:
+        MockProvider("en", "fr").translate_obj(*materialized)
+    translator = MockProvider("en", "fr")
+    translator.raw_streamfields = True
+    with Measurement("translate_obj, raw StreamField") as raw_run:
+        translator.translate_obj(*raw)
+
+    assert raw_run.calls == materialized_run.calls == 1
+    assert raw_run.characters == materialized_run.characters
+    # Chooser blocks don't load their objects.
+    assert raw_run.query_count < materialized_run.query_count
+
+
+def test_translate_html():
+    html = rich_text(500 * SCALE)
+    translator = MockProvider("en", "fr")
+
+    with Measurement("translate_html, large rich text") as run:
+        translation = translator.batch(translator.translate_html, html)
+
+    assert translation.startswith("<p>Cnentencu 0 jvgu <strong>obyq</strong>")
+    assert run.calls == 1
+    assert run.query_count == 0
+
+
+def test_translate_obj_http(settings, related_objects):
+    class Translator(HTTPTranslator):
+        use_translation_memory = False
+        use_stamps = False
+
+    pages = [make_translation(10 * SCALE, related_objects) for _ in range(5)]
+
+    with StandInServer(latency=LATENCY) as server:
+        settings.WAGTAIL_TRANSLATE_HTTP = {"URL": f"{server.url}/translate"}
+        with Measurement(f"translate_obj over HTTP, {len(pages)} pages"):
+            for page, target in pages:
+                Translator("en", "fr").translate_obj(page, target)
+
+    assert pages[0][1].title.startswith("Cntr ")
+    # The connection is reused between requests.
+    assert len(server.requests) >= len(pages)
+    assert server.connections == 1
+
+
+def test_translate_subtree(mock_provider, related_objects):
+    def copy_subtree(children):
+        parent = make_page(5 * SCALE, related_objects, title=f"Parent {children}")
+        for i in range(children):
+            make_page(5 * SCALE, related_objects, parent=parent, title=f"Child {i}")
+        locale = LocaleFactory(language_code="fr")
+        with Measurement(f"subtree copy, {children + 1} pages") as run:
+            with collect_translations(max_workers=4):
+                CopyPageForTranslationAction(
+                    parent, locale, include_subtree=True
+                ).execute()
+        return run
+
+    small_run = copy_subtree(2)
+    large_run = copy_subtree(6)
+
+    # One request per page.
+    assert small_run.calls == 3
+    assert large_run.calls == 7
+    # A fixed number of queries per page, copying included.
+    queries_per_page = (large_run.query_count - small_run.query_count) / 4
+    assert queries_per_page <= 100
@@ -0,0 +1,68 @@
+import pytest
+
+from tests.factories import RecordingTranslator
+from wagtail_translate.cache import TranslationCache, get_translation_cache
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_l1_lru_eviction():
+    cache = TranslationCache(max_size=2, backend=None)
+    cache.set_many("ns", {"One": "Un", "Two": "Deux"})
+    assert cache.get_many("ns", ["One"]) == {"One": "Un"}
+
+    # "Two" is the least recently used, and evicted.
+    cache.set_many("ns", {"Three": "Trois"})
+    assert cache.get_many("ns", ["One", "Two", "Three"]) == {
+        "One": "Un",
+        "Three": "Trois",
+    }
+    assert cache.stats == {
+        "l1_hits": 3,
+        "l2_hits": 0,
+        "misses": 1,
+        "evictions": 1,
+        "size": 2,
+    }
+
+
+def test_namespaces_are_separate():
+    cache = TranslationCache(backend=None)
+    cache.set_many("en:fr", {"One": "Un"})
+    assert cache.get_many("en:nl", ["One"]) == {}
+
+
+def test_l2_is_shared(locmem_cache):
+    # Two caches, like two worker processes.
+    one = TranslationCache(backend=locmem_cache)
+    two = TranslationCache(backend=locmem_cache)
+    one.set_many("ns", {"One": "Un"})
+
+    assert two.get_many("ns", ["One", "Two"]) == {"One": "Un"}
+    assert two.stats["l2_hits"] == 1
+    assert two.stats["misses"] == 1
+
+    # The L2 hit is promoted to the L1.
+    assert two.get_many("ns", ["One"]) == {"One": "Un"}
+    assert two.stats["l1_hits"] == 1
+
+
+def test_cache_is_disabled_by_default():
+    assert get_translation_cache() is None
+
+
+def test_translator_uses_cache(settings, locmem_cache):
+    settings.WAGTAIL_TRANSLATE_CACHE = {"MAX_SIZE": 100, "BACKEND": locmem_cache}
+
+    translator = RecordingTranslator("en", "fr")
+    assert translator.translate_html("<p>One</p>") == "<p>Bar</p>"
+    assert translator.translate_html("<p>One</p>") == "<p>Bar</p>"
+    assert translator.batches == [["One"]]
+
+    # Other language pairs and translator classes do not share translations.
+    other = RecordingTranslator("en", "nl")
+    other.translate_html("<p>One</p>")
+    assert other.batches == [["One"]]
+
+    assert get_translation_cache().stats["l1_hits"] == 1
@@ -0,0 +1,225 @@
+import codecs
+import re
+
+from types import SimpleNamespace
+from unittest import mock
+
+import deepl
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+
+from wagtail_translate.throttling import get_rate_limiter
+from wagtail_translate.translators import deepl as deepl_translator
+from wagtail_translate.translators.deepl import (
+    AsyncDeepLTranslator,
+    DeepLTranslator,
+    HTMLSegment,
+    chunk_strings,
+    get_client,
+)
+
+
+class FakeClient:
+    """Stands in for deepl.Translator, translates with ROT13."""
+
+    def __init__(self, auth_key):
+        self.auth_key = auth_key
+        self.requests = []
+
+    def translate_text(self, text, **kwargs):
+        self.requests.append((list(text), kwargs))
+        return [SimpleNamespace(text=self.rot13(t, **kwargs)) for t in text]
+
+    @staticmethod
+    def rot13(text, tag_handling=None, **kwargs):
+        if tag_handling == "html":
+            # Leave the tags alone.
+            return re.sub(
+                r"(<[^>]*>)|([^<]+)",
+                lambda m: m.group(1) or codecs.encode(m.group(2), "rot13"),
+                text,
+            )
+        return codecs.encode(text, "rot13")
+
+
+@pytest.fixture
+def fake_deepl(settings):
+    settings.WAGTAIL_TRANSLATE_DEEPL_KEY = "test-key"
+    get_client.cache_clear()
+    with mock.patch.object(deepl_translator.deepl, "Translator", FakeClient):
+        yield
+    get_client.cache_clear()
+
+
+def test_requires_auth_key(settings):
+    del settings.WAGTAIL_TRANSLATE_DEEPL_KEY
+    with pytest.raises(ImproperlyConfigured):
+        DeepLTranslator("en", "fr")
+
+
+def test_client_is_shared(fake_deepl):
+    one = DeepLTranslator("en", "fr")
+    two = DeepLTranslator("en", "nl")
+    assert one.client is two.client
+    assert one.client.auth_key == "test-key"
+
+
+def test_translate(fake_deepl):
+    translator = DeepLTranslator("en", "fr")
+    assert translator.translate("Hello") == "Uryyb"
+    assert translator.translate("") == ""
+    assert translator.client.requests == [
+        (["Hello"], {"source_lang": "en", "target_lang": "fr"}),
+    ]
+
+
+def test_translate_many_chunks_requests(fake_deepl):
+    translator = DeepLTranslator("en", "fr")
+    source_strings = [f"Text {i}" for i in range(120)]
+    source_strings.insert(10, "")
+
+    translations = translator.translate_many(source_strings)
+
+    assert translations == [codecs.encode(s, "rot13") for s in source_strings]
+    assert [len(texts) for texts, _ in translator.client.requests] == [50, 50, 20]
+
+
+def test_chunk_strings_by_size():
+    chunks = list(chunk_strings(["a" * 6, "b" * 6, "c" * 20, "d"], max_size=12))
+    assert chunks == [["a" * 6, "b" * 6], ["c" * 20], ["d"]]
+
+
+def test_chunk_strings_by_count():
+    chunks = list(chunk_strings(["a", "b", "c"], max_texts=2))
+    assert chunks == [["a", "b"], ["c"]]
+
+
+def test_async_translate_many(fake_deepl):
+    translator = AsyncDeepLTranslator("en", "fr")
+    source_strings = ["", *(f"Text {i}" for i in range(120))]
+
+    translations = translator.translate_many(source_strings)
+
+    assert translations == [codecs.encode(s, "rot13") for s in source_strings]
+    assert sorted(len(texts) for texts, _ in translator.client.requests) == [
+        20,
+        50,
+        50,
+    ]
+    assert translator.translate("Hello") == "Uryyb"
+
+
+RICH_TEXT = (
+    '<p>Hello <a linktype="page" id="3">world</a></p>'
+    '<embed alt="A cat" embedtype="image" format="left" id="1"/>'
+)
+
+
+def test_tag_handling(fake_deepl, settings):
+    settings.WAGTAIL_TRANSLATE_DEEPL_TAG_HANDLING = "html"
+    translator = DeepLTranslator("en", "fr")
+    translator.use_translation_memory = False
+
+    translation = translator.batch(translator.translate_html, RICH_TEXT)
+
+    assert translation == (
+        '<p>Uryyb <a linktype="page" id="3">jbeyq</a></p>'
+        '<embed alt="N png" embedtype="image" format="left" id="1"/>'
+    )
+    # The alt text, and the HTML as a whole, with the entities protected.
+    assert translator.client.requests == [
+        (["A cat"], {"source_lang": "en", "target_lang": "fr"}),
+        (
+            [
+                '<p>Hello <a data-wagtail-translate="1">world</a></p>'
+                '<embed data-wagtail-translate="2"/>'
+            ],
+            {"source_lang": "en", "target_lang": "fr", "tag_handling": "html"},
+        ),
+    ]
+
+
+def test_tag_handling_mangled_entities(fake_deepl, settings):
+    settings.WAGTAIL_TRANSLATE_DEEPL_TAG_HANDLING = "html"
+    translator = DeepLTranslator("en", "fr")
+    translator.use_translation_memory = False
+
+    # DeepL drops the entity placeholders.
+    rot13 = staticmethod(lambda text, **kwargs: codecs.encode(text, "rot13"))
+    with mock.patch.object(FakeClient, "rot13", rot13):
+        translation = translator.batch(translator.translate_html, RICH_TEXT)
+
+    # Falls back to translating the text nodes.
+    assert translation == (
+        '<p>Uryyb <a linktype="page" id="3">jbeyq</a></p>'
+        '<embed alt="N png" embedtype="image" format="left" id="1"/>'
+    )
+
+
+def test_tag_handling_skipped_elements(fake_deepl, settings):
+    settings.WAGTAIL_TRANSLATE_DEEPL_TAG_HANDLING = "html"
+    translator = DeepLTranslator("en", "fr")
+    translator.use_translation_memory = False
+    html = "<p>Run <code>pip install wagtail</code> now.</p><script>var x;</script>"
+
+    translation = translator.batch(translator.translate_html, html)
+
+    assert translation == (
+        "<p>Eha <code>pip install wagtail</code> abj.</p><script>var x;</script>"
+    )
+    # The skipped elements are not sent.
+    assert translator.client.requests[0][0] == [
+        '<p>Run <embed data-wagtail-translate="1"/> now.</p>'
+        '<embed data-wagtail-translate="2"/>'
+    ]
+
+
+def test_text_and_html_are_sent_separately(fake_deepl):
+    translator = DeepLTranslator("en", "fr")
+    translator.tag_handling = "html"
+    source_strings = ["One", HTMLSegment("<p>Two</p>"), "", "Three"]
+
+    translations = translator.translate_many(source_strings)
+
+    assert translations == ["Bar", "<p>Gjb</p>", "", "Guerr"]
+    assert [kwargs.get("tag_handling") for _, kwargs in translator.client.requests] == [
+        None,
+        "html",
+    ]
+
+
+@mock.patch("wagtail_translate.throttling.time.sleep")
+def test_deepl_retries_too_many_requests(sleep, fake_deepl, locmem_cache, settings):
+    settings.WAGTAIL_TRANSLATE_RATE_LIMIT = {
+        "REQUESTS_PER_SECOND": 100,
+        "BACKEND": locmem_cache,
+    }
+    translator = DeepLTranslator("en", "fr")
+    translate_text = FakeClient.translate_text
+    responses = [deepl.TooManyRequestsException("Too many requests")]
+
+    def flaky_translate_text(client, text, **kwargs):
+        if responses:
+            raise responses.pop()
+        return translate_text(client, text, **kwargs)
+
+    with mock.patch.object(FakeClient, "translate_text", flaky_translate_text):
+        assert translator.translate_many(["One", "Two"]) == ["Bar", "Gjb"]
+    assert sleep.call_count == 1
+
+    # DeepL translators of the same account share the rate limit.
+    assert get_rate_limiter(translator.rate_limit_key) is get_rate_limiter(
+        DeepLTranslator("en", "nl").rate_limit_key
+    )
+
+
+def test_deepl_does_not_retry_other_errors(fake_deepl):
+    translator = DeepLTranslator("en", "fr")
+    with mock.patch.object(
+        FakeClient,
+        "translate_text",
+        side_effect=deepl.AuthorizationException("Invalid key"),
+    ):
+        with pytest.raises(deepl.AuthorizationException):
+            translator.translate_many(["One"])
@@ -0,0 +1,171 @@
+import threading
+import uuid
+
+import pytest
+
+from django.urls import reverse
+from wagtail.actions.copy_for_translation import CopyPageForTranslationAction
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.test_subtree import SlowTranslator
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.default_behaviour.translation import (
+    collect_translations,
+    translate_and_save_fanout,
+)
+
+
+pytestmark = pytest.mark.django_db
+
+
+class FanOutTranslator(SlowTranslator):
+    use_stamps = False
+    collects = []
+
+    def collect_segments(self, method, *args, **kwargs):
+        FanOutTranslator.collects.append(self.target_language_code)
+        return super().collect_segments(method, *args, **kwargs)
+
+
+@pytest.fixture
+def fanout_translator(settings):
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = "tests.test_fanout.FanOutTranslator"
+    FanOutTranslator.threads = set()
+    FanOutTranslator.max_in_flight = 0
+    FanOutTranslator.sent = []
+    FanOutTranslator.collects = []
+
+
+@pytest.fixture
+def page():
+    category = BlogCategory.objects.create(name="Category")
+    page = BlogPostPageFactory(
+        title="Title",
+        intro="<p>Intro</p>",
+        category=category,
+        body=[
+            {"type": "heading", "value": "Heading", "id": str(uuid.uuid4())},
+            {"type": "paragraph", "value": "<p>Paragraph</p>", "id": str(uuid.uuid4())},
+            {"type": "snippet", "value": category.pk, "id": str(uuid.uuid4())},
+        ],
+    )
+    return BlogPostPage.objects.get(pk=page.pk)
+
+
+@pytest.fixture
+def locales(fanout_translator, page):
+    locales = [LocaleFactory(language_code=code) for code in ("fr", "de", "nl")]
+    for locale in locales:
+        page.category.copy_for_translation(locale).save()
+    FanOutTranslator.collects = []
+    FanOutTranslator.threads = set()
+    return locales
+
+
+def assert_translated(page, locale):
+    translation = page.get_translation(locale).get_latest_revision_as_object()
+    assert translation.title == "Gvgyr"
+    assert translation.intro == "<p>Vageb</p>"
+    assert translation.body[0].value == "Urnqvat"
+    assert translation.body[1].value.source == "<p>Cnentencu</p>"
+    assert translation.body[2].value.locale == locale
+    assert translation.category.locale == locale
+
+
+def test_translate_and_save_fanout(page, locales):
+    with collect_translations():
+        targets = [
+            CopyPageForTranslationAction(page, locale).execute() for locale in locales
+        ]
+    FanOutTranslator.collects = []
+    FanOutTranslator.max_in_flight = 0
+
+    stats = translate_and_save_fanout(page, targets, max_workers=4)
+
+    for locale in locales:
+        assert_translated(page, locale)
+    # The source is walked once, and sent for all languages concurrently.
+    assert FanOutTranslator.collects == ["fr"]
+    assert FanOutTranslator.max_in_flight == 3
+    assert stats["objects"] == 3
+    assert stats["shared"] == 2
+    # The source is not changed.
+    assert page.body[0].value == "Heading"
+
+
+def test_each_locale_is_translated_from_the_source(page, locales):
+    with collect_translations() as stats:
+        for locale in locales:
+            CopyPageForTranslationAction(page, locale).execute()
+
+    # The blocks of the source are not changed by the first translation.
+    for locale in locales:
+        translation = page.get_translation(locale).get_latest_revision_as_object()
+        assert translation.body[0].value == "Urnqvat"
+    assert stats["shared"] == 2
+    assert threading.get_ident() not in FanOutTranslator.threads
+
+
+def test_each_locale_is_translated_from_the_source_by_default(page, locales):
+    # Without collect_translations, each copy is translated by the signal handler.
+    for locale in locales:
+        CopyPageForTranslationAction(page, locale).execute()
+
+    for locale in locales:
+        assert_translated(page, locale)
+    assert page.body[0].value == "Heading"
+
+
+def test_changed_blocks_are_collected_per_target(page, locales):
+    FanOutTranslator.use_stamps = True
+    try:
+        with collect_translations():
+            for locale in locales:
+                CopyPageForTranslationAction(page, locale).execute()
+        page.body[0].value = "Changed"
+        targets = [
+            page.get_translation(locale).get_latest_revision_as_object()
+            for locale in locales
+        ]
+        FanOutTranslator.collects = []
+
+        stats = translate_and_save_fanout(page, targets)
+    finally:
+        FanOutTranslator.use_stamps = False
+
+    # The blocks are matched with the blocks of each target.
+    assert len(FanOutTranslator.collects) == 3
+    assert stats["shared"] == 0
+    for locale in locales:
+        translation = page.get_translation(locale).get_latest_revision_as_object()
+        assert translation.title == "Gvgyr"
+        assert translation.body[0].value == "Punatrq"
+
+
+def test_raw_streamfields(settings, page, locales):
+    settings.WAGTAIL_TRANSLATE_RAW_STREAMFIELDS = True
+
+    with collect_translations() as stats:
+        for locale in locales:
+            CopyPageForTranslationAction(page, locale).execute()
+
+    for locale in locales:
+        assert_translated(page, locale)
+    assert FanOutTranslator.collects == ["fr"]
+    assert stats["shared"] == 2
+
+
+def test_fanout_setting(settings, admin_client, page, locales):
+    from wagtail_translate.default_behaviour import monkeypatch_fanout  # noqa
+
+    settings.WAGTAIL_TRANSLATE_FANOUT = True
+
+    response = admin_client.post(
+        reverse("simple_translation:submit_page_translation", args=[page.pk]),
+        {"locales": [locale.pk for locale in locales]},
+    )
+
+    assert response.status_code == 302
+    for locale in locales:
+        assert_translated(page, locale)
+    assert len(FanOutTranslator.collects) == 1
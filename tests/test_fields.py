@@ -0,0 +1,38 @@
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.fields import (
+    clear_translatable_fields_cache,
+    find_translatable_fields,
+    get_translatable_fields,
+    get_translatable_fields_cache,
+)
+
+
+def test_cache_is_populated_when_ready():
+    cache = get_translatable_fields_cache()
+    assert BlogPostPage in cache
+    assert BlogCategory in cache
+
+
+def test_translatable_fields_are_cached():
+    fields = get_translatable_fields(BlogPostPage)
+    assert get_translatable_fields(BlogPostPage) is fields
+    assert [field.name for field in fields] == [
+        field.name for field in find_translatable_fields(BlogPostPage)
+    ]
+    assert {"title", "intro", "body", "category"} <= {field.name for field in fields}
+
+
+def test_clear_cache(monkeypatch):
+    fields = get_translatable_fields(BlogCategory)
+    assert [field.name for field in fields] == ["name"]
+
+    monkeypatch.setattr(BlogCategory, "translatable_fields", [], raising=False)
+    assert get_translatable_fields(BlogCategory) is fields
+    clear_translatable_fields_cache(BlogCategory)
+    assert get_translatable_fields(BlogCategory) == []
+    assert BlogPostPage in get_translatable_fields_cache()
+
+    monkeypatch.undo()
+    clear_translatable_fields_cache()
+    assert get_translatable_fields_cache() == {}
+    assert get_translatable_fields(BlogCategory) == fields
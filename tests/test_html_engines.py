@@ -0,0 +1,285 @@
+import re
+
+from unittest import mock
+
+import pytest
+
+from wagtail_translate import html_engines
+from wagtail_translate.html_engines import (
+    BeautifulSoupEngine,
+    PlaceholderHTMLEngine,
+    StreamingHTMLEngine,
+    tokenize,
+)
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+class Translator(ROT13Translator):
+    use_translation_memory = False
+
+
+class SoupTranslator(Translator):
+    html_engine = BeautifulSoupEngine()
+
+
+def test_markup_is_kept_byte_for_byte():
+    translator = Translator("en", "fr")
+    html = (
+        "<!-- comment -->\n"
+        "<P CLASS=intro>Hello<br>\n"
+        "  <a href='/x?a=1&amp;b=2' title = 'Go' >World</a>&nbsp;</P>"
+    )
+    assert translator.translate_html(html) == (
+        "<!-- comment -->\n"
+        "<P CLASS=intro>Uryyb<br>\n"
+        "  <a href='/x?a=1&amp;b=2' title = 'Tb' >Jbeyq</a>&nbsp;</P>"
+    )
+
+
+def test_translations_are_escaped():
+    engine = StreamingHTMLEngine()
+    html = '<p title=Hi alt="Hi">Hi</p>'
+    result = engine.translate(
+        html,
+        lambda text: "<b> & 'co'" if text == "Hi" else text,
+        lambda name, value: 'Say "hi"',
+    )
+    assert result == (
+        '<p title="Say &quot;hi&quot;" alt="Say &quot;hi&quot;">'
+        "&lt;b&gt; &amp; 'co'</p>"
+    )
+
+
+def test_text_is_unescaped():
+    tokens = tokenize("<p>Fish &amp;\nchips</p>")
+    assert [token.text for token in tokens if token.kind == "text"] == ["Fish &\nchips"]
+
+
+def test_plain_text_is_not_parsed():
+    with mock.patch.object(html_engines, "Tokenizer") as tokenizer:
+        assert tokenize("Fish &amp; chips") == (
+            html_engines.Token("text", 0, 16, text="Fish & chips"),
+        )
+    tokenizer.assert_not_called()
+
+
+def test_html_is_tokenized_once():
+    translator = Translator("en", "fr")
+    with mock.patch.object(html_engines, "tokenize", wraps=tokenize) as tokenizer:
+        translator.batch(translator.translate_html, "<p>Hello <em>world</em></p>")
+    # Collecting and applying the translations walk the same HTML.
+    tokenizer.assert_called_once()
+    # The tokens are kept for the batch only.
+    assert translator._tokens is None
+
+
+def test_engine_cache():
+    engine = StreamingHTMLEngine()
+    cache = {}
+    tokens = engine.get_tokens("<p>Hello</p>", cache)
+    assert engine.get_tokens("<p>Hello</p>", cache) is tokens
+    assert len(cache) == 1
+    # Without a cache, the HTML is tokenized again.
+    assert engine.get_tokens("<p>Hello</p>") is not tokens
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<p>Hello <strong>world</strong></p>",
+        '<p><img alt="An image" src="/a.png"/> <a href="/" title="A link">Link</a></p>',
+        "<h2>Title</h2><ul><li>One</li><li> Two </li></ul>",
+    ],
+)
+def test_engines_agree(html):
+    assert Translator("en", "fr").translate_html(html) == SoupTranslator(
+        "en", "fr"
+    ).translate_html(html)
+
+
+def test_translations_are_batched():
+    class BatchTranslator(Translator):
+        batches = []
+
+        def translate_many(self, source_strings):
+            self.batches.append(list(source_strings))
+            return super().translate_many(source_strings)
+
+    translator = BatchTranslator("en", "fr")
+    html = '<p title="Title">Hello <em>world</em></p>'
+    assert translator.batch(translator.translate_html, html) == (
+        '<p title="Gvgyr">Uryyb <em>jbeyq</em></p>'
+    )
+    assert translator.batches == [["Title", "Hello", "world"]]
+
+
+class PlaceholderTranslator(Translator):
+    html_engine = PlaceholderHTMLEngine()
+    batches = []
+
+    def translate_many(self, source_strings):
+        self.batches.append(list(source_strings))
+        return super().translate_many(source_strings)
+
+
+def test_placeholders_one_segment_per_block():
+    translator = PlaceholderTranslator("en", "fr")
+    translator.batches = []
+    html = (
+        "<h2>Title</h2>"
+        '<p>The <em class="x">black</em> cat<br>sits <a title="Link" href="/">here</a>.</p>'
+        "<ul><li><b>One</b></li><li>Two <i>three</i></li></ul>"
+    )
+
+    result = translator.batch(translator.translate_html, html)
+
+    assert translator.batches == [
+        [
+            "Title",
+            "Link",
+            "The ⟦1⟧black⟦/1⟧ cat⟦2/⟧sits ⟦3⟧here⟦/3⟧.",
+            # The text nodes, the fallback for mangled placeholders.
+            *["The", "black", "cat", "sits", "here"],
+            "One",
+            "Two ⟦1⟧three⟦/1⟧",
+            *["Two", "three"],
+        ]
+    ]
+    assert result == (
+        "<h2>Gvgyr</h2>"
+        '<p>Gur <em class="x">oynpx</em> png<br>fvgf <a title="Yvax" href="/">urer</a>.</p>'
+        "<ul><li><b>Bar</b></li><li>Gjb <i>guerr</i></li></ul>"
+    )
+
+
+def test_placeholders_may_move():
+    engine = PlaceholderHTMLEngine()
+    result = engine.translate(
+        "<p>The <em>black</em> cat</p>",
+        lambda text: {"The ⟦1⟧black⟦/1⟧ cat": "Le chat ⟦ 1 ⟧noir⟦/1⟧"}.get(text, text),
+        None,
+    )
+    assert result == "<p>Le chat <em>noir</em></p>"
+
+
+@pytest.mark.parametrize(
+    "translation",
+    [
+        "Le chat ⟦1⟧noir",  # Missing
+        "Le chat ⟦1⟧noir⟦/1⟧ ⟦1⟧",  # Duplicated
+        "Le chat ⟦/1⟧noir⟦1⟧",  # Out of order
+        "Le chat ⟦1/⟧noir",  # Wrong kind
+        "Le chat ⟦1⟧noir⟦/1⟧ ⟦2/⟧",  # Unknown
+    ],
+)
+def test_mangled_placeholders_fall_back(translation):
+    translations = {
+        "The ⟦1⟧black⟦/1⟧ cat": translation,
+        "The ": "Le ",
+        "black": "noir",
+        " cat": " chat",
+    }
+    engine = PlaceholderHTMLEngine()
+    result = engine.translate(
+        "<p>The <em>black</em> cat</p>", translations.__getitem__, None
+    )
+    assert result == "<p>Le <em>noir</em> chat</p>"
+
+
+def test_mangled_placeholders_are_batched():
+    class ManglingTranslator(PlaceholderTranslator):
+        def translate(self, source_string):
+            # Drops the closing placeholders.
+            return re.sub(r"⟦/\d+⟧", "", super().translate(source_string))
+
+    translator = ManglingTranslator("en", "fr")
+    translator.batches = []
+    html = "".join(f"<p>Paragraph <em>{i}</em> of <b>many</b>.</p>" for i in range(50))
+
+    result = translator.batch(translator.translate_html, html)
+
+    # The fallback translations are part of the single batch.
+    assert len(translator.batches) == 1
+    assert result.startswith("<p>Cnentencu <em>0</em> bs <b>znal</b>.</p>")
+
+    # Outside a batch, the HTML is translated in a batch of its own.
+    translator.batches = []
+    assert translator.translate_html(html) == result
+    assert len(translator.batches) == 1
+
+
+SKIPPED_HTML = (
+    "<p>Run <code>pip install <em>wagtail</em></code> now.</p>"
+    "<pre><code>print('Hello')</code></pre>"
+    "<script>var title = 'Hello';</script>"
+    "<style>p { color: red; }</style>"
+    '<p translate="no" title="Product">Wagtail <b>CMS</b></p>'
+    '<p>Use <span class="brand notranslate">Wagtail</span>.</p>'
+    '<div><div translate="no"><div>Nested</div> Skipped</div> Translated</div>'
+    '<img translate="no" alt="Logo"><img alt="Photo">'
+)
+
+
+@pytest.mark.parametrize("translator_class", [Translator, SoupTranslator])
+def test_skipped_elements(translator_class):
+    class BatchTranslator(translator_class):
+        batches = []
+
+        def translate_many(self, source_strings):
+            self.batches.append(list(source_strings))
+            return super().translate_many(source_strings)
+
+    translator = BatchTranslator("en", "fr")
+    result = translator.batch(translator.translate_html, SKIPPED_HTML)
+
+    assert sorted(translator.batches[0]) == sorted(
+        ["Run", "now.", "Use", "Translated", "Photo"]
+    )
+    assert "<script>var title = 'Hello';</script>" in result
+    assert "Genafyngrq" in result
+
+
+def test_skipped_elements_streaming():
+    result = Translator("en", "fr").translate_html(SKIPPED_HTML)
+    assert result == SKIPPED_HTML.replace("Run", "Eha").replace("now.", "abj.").replace(
+        "Use", "Hfr"
+    ).replace("Translated", "Genafyngrq").replace("Photo", "Cubgb")
+
+
+def test_skip_selectors(settings):
+    settings.WAGTAIL_TRANSLATE_SKIP_SELECTORS = ["span.brand", ".sku"]
+    translator = Translator("en", "fr")
+    html = (
+        '<p><span class="brand">Wagtail</span> <b class="brand">Bold</b> '
+        '<i class="SKU">ABC</i> <code>Code</code></p>'
+    )
+    assert translator.translate_html(html) == (
+        '<p><span class="brand">Wagtail</span> <b class="brand">Obyq</b> '
+        '<i class="SKU">ABC</i> <code>Pbqr</code></p>'
+    )
+    # Per engine.
+    engine = StreamingHTMLEngine(skip_selectors=["b"])
+    assert engine.translate(html, str.upper, None) == (
+        '<p><span class="brand">WAGTAIL</span> <b class="brand">Bold</b> '
+        '<i class="SKU">ABC</i> <code>CODE</code></p>'
+    )
+
+
+def test_unclosed_skipped_element():
+    html = "<p>One</p><code>Two<p>Three</p>"
+    assert Translator("en", "fr").translate_html(html) == (
+        "<p>Bar</p><code>Two<p>Three</p>"
+    )
+
+
+def test_skipped_inline_element_is_a_placeholder():
+    translator = PlaceholderTranslator("en", "fr")
+    translator.batches = []
+    html = "<p>Install <code>wagtail</code> with <em>pip</em>.</p>"
+
+    result = translator.batch(translator.translate_html, html)
+
+    assert translator.batches == [
+        ["Install ⟦1/⟧ with ⟦2⟧pip⟦/2⟧.", "Install", "with", "pip"]
+    ]
+    assert result == "<p>Vafgnyy <code>wagtail</code> jvgu <em>cvc</em>.</p>"
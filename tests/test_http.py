@@ -0,0 +1,158 @@
+import uuid
+
+from unittest import mock
+
+import pytest
+import requests
+
+from django.core.exceptions import ImproperlyConfigured
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.testapp.models import BlogPostPage
+from wagtail_translate import signals
+from wagtail_translate.translators.http import (
+    HTTPTranslator,
+    OpenAITranslator,
+    get_retry_after,
+)
+from wagtail_translate.translators.http_server import StandInServer
+
+
+class Translator(HTTPTranslator):
+    use_translation_memory = False
+    use_stamps = False
+
+
+@pytest.fixture
+def server(settings):
+    with StandInServer() as server:
+        settings.WAGTAIL_TRANSLATE_HTTP = {"URL": f"{server.url}/translate"}
+        yield server
+
+
+def test_translate_many(server):
+    translator = Translator("en", "fr")
+    assert translator.translate_many(["Hello", "", "world"]) == [
+        "Uryyb",
+        "",
+        "jbeyq",
+    ]
+
+    path, body = server.requests[0]
+    assert path == "/translate"
+    # Empty strings are not sent.
+    assert body == {
+        "q": ["Hello", "world"],
+        "source": "en",
+        "target": "fr",
+        "format": "text",
+    }
+
+
+def test_requests_are_batched(server, settings):
+    settings.WAGTAIL_TRANSLATE_HTTP["MAX_TEXTS_PER_REQUEST"] = 50
+    source_strings = [f"String {i}" for i in range(120)]
+    requested = []
+
+    def record(sender, segments, **kwargs):
+        requested.append(segments)
+
+    signals.translation_requested.connect(record, sender=Translator)
+    try:
+        translations = Translator("en", "fr").translate_many(source_strings)
+    finally:
+        signals.translation_requested.disconnect(record, sender=Translator)
+
+    assert translations[119] == "Fgevat 119"
+    assert [len(body["q"]) for _, body in server.requests] == [50, 50, 20]
+    # A signal per call to the translation service.
+    assert requested == [50, 50, 20]
+
+
+def test_connections_are_kept_alive(server):
+    for i in range(5):
+        Translator("en", "fr").translate_many([f"String {i}"])
+
+    assert len(server.requests) == 5
+    assert server.connections == 1
+
+
+@pytest.mark.django_db
+def test_translate_obj(server):
+    page = BlogPostPageFactory(
+        title="Title",
+        body=[{"type": "heading", "value": "Heading", "id": str(uuid.uuid4())}],
+    )
+    target = page.copy_for_translation(LocaleFactory(language_code="fr"))
+    page = BlogPostPage.objects.get(pk=page.pk)
+
+    Translator("en", "fr").translate_obj(page, target)
+
+    assert target.title == "Gvgyr"
+    assert target.body[0].value == "Urnqvat"
+    assert len(server.requests) == 1
+
+
+@mock.patch("wagtail_translate.throttling.time.sleep")
+def test_retry_after(sleep, server):
+    server.fail(status=429, retry_after=2)
+
+    assert Translator("en", "fr").translate_many(["Hello"]) == ["Uryyb"]
+    sleep.assert_called_once_with(2.0)
+    assert len(server.requests) == 2
+
+
+def test_errors_are_raised(server, settings):
+    settings.WAGTAIL_TRANSLATE_RETRY = {"ATTEMPTS": 1}
+    server.fail(status=400)
+
+    with pytest.raises(requests.HTTPError):
+        Translator("en", "fr").translate_many(["Hello"])
+
+
+def test_timeout(server, settings):
+    settings.WAGTAIL_TRANSLATE_HTTP["TIMEOUT"] = 0.05
+    settings.WAGTAIL_TRANSLATE_RETRY = {"ATTEMPTS": 1}
+    server.latency = 0.5
+
+    with pytest.raises(requests.Timeout):
+        Translator("en", "fr").translate_many(["Hello"])
+
+
+def test_api_key(server, settings):
+    server.api_key = "secret"
+    with pytest.raises(requests.HTTPError):
+        Translator("en", "fr").translate_many(["Hello"])
+
+    settings.WAGTAIL_TRANSLATE_HTTP["API_KEY"] = "secret"
+    assert Translator("en", "fr").translate_many(["Hello"]) == ["Uryyb"]
+
+
+def test_openai_translator(server, settings):
+    server.api_key = "secret"
+    settings.WAGTAIL_TRANSLATE_HTTP = {
+        "URL": f"{server.url}/v1/chat/completions",
+        "API_KEY": "secret",
+        "MODEL": "translate-small",
+    }
+
+    translator = OpenAITranslator("en", "fr")
+    assert translator.translate_many(["Hello", "world"]) == ["Uryyb", "jbeyq"]
+    _, body = server.requests[0]
+    assert body["model"] == "translate-small"
+    assert body["messages"][-1]["content"] == '["Hello", "world"]'
+
+
+def test_url_is_required(settings):
+    settings.WAGTAIL_TRANSLATE_HTTP = {}
+    with pytest.raises(ImproperlyConfigured):
+        HTTPTranslator("en", "fr")
+
+
+def test_get_retry_after():
+    response = requests.Response()
+    assert get_retry_after(response) is None
+    response.headers["Retry-After"] = "3"
+    assert get_retry_after(response) == 3.0
+    response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert get_retry_after(response) == 0.0
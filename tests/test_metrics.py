@@ -0,0 +1,170 @@
+import logging
+import uuid
+
+import pytest
+
+from django.http import Http404
+from django.test import RequestFactory
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate import signals
+from wagtail_translate.metrics import (
+    Histogram,
+    LoggingSink,
+    PrometheusSink,
+    get_sink,
+    metrics_view,
+)
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+pytestmark = pytest.mark.django_db
+
+
+class Translator(ROT13Translator):
+    use_translation_memory = False
+    use_stamps = False
+
+
+@pytest.fixture
+def page():
+    LocaleFactory(language_code="en")
+    locale_fr = LocaleFactory(language_code="fr")
+    category = BlogCategory.objects.create(name="Category")
+    category.copy_for_translation(locale_fr).save()
+    page = BlogPostPageFactory(
+        title="Title",
+        category=category,
+        body=[
+            {"type": "heading", "value": "Heading", "id": str(uuid.uuid4())},
+            {"type": "list", "value": ["One", "Two"], "id": str(uuid.uuid4())},
+        ],
+    )
+    target = page.copy_for_translation(locale_fr)
+    return BlogPostPage.objects.get(pk=page.pk), target
+
+
+@pytest.fixture
+def prometheus(settings):
+    settings.WAGTAIL_TRANSLATE_METRICS = ["wagtail_translate.metrics.PrometheusSink"]
+    return get_sink(PrometheusSink)
+
+
+def test_signals(page):
+    events = []
+
+    def recorder(name):
+        def record(sender, signal, translator, duration, **kwargs):
+            events.append((name, kwargs))
+
+        return record
+
+    receivers = {
+        name: recorder(name)
+        for name in [
+            "translation_requested",
+            "segments_translated",
+            "field_translated",
+            "block_translated",
+            "related_translations_fetched",
+        ]
+    }
+    for name, func in receivers.items():
+        getattr(signals, name).connect(func, sender=Translator)
+    try:
+        Translator("en", "fr").translate_obj(*page)
+    finally:
+        for name, func in receivers.items():
+            getattr(signals, name).disconnect(func, sender=Translator)
+
+    names = [name for name, _ in events]
+    assert names.count("segments_translated") == 1
+    batch = dict(events)["segments_translated"]
+    assert batch["segments"] >= 4
+    assert batch["characters"] >= len("TitleHeadingOneTwo")
+
+    # ROT13 translates one string per call.
+    requests = [e for name, e in events if name == "translation_requested"]
+    assert len(requests) == batch["segments"]
+    assert {"segments": 1, "characters": len("Heading")} in requests
+    assert sum(r["characters"] for r in requests) == batch["characters"]
+
+    fields = [e for name, e in events if name == "field_translated"]
+    assert {"field": "body", "model": BlogPostPage, "phase": "apply"} in fields
+    assert {"field": "body", "model": BlogPostPage, "phase": "collect"} in fields
+
+    blocks = [e["block_type"] for name, e in events if name == "block_translated"]
+    assert blocks.count("ListBlock") == 2  # Collect and apply
+    assert blocks.count("CharBlock") == 2 * 3
+
+    related = dict(events)["related_translations_fetched"]
+    assert related == {"model": BlogCategory, "objects": 1, "queries": 1}
+
+
+def test_logging_sink(caplog, page):
+    sink = LoggingSink()
+    sink.connect()
+    try:
+        with caplog.at_level(logging.DEBUG, logger="wagtail_translate.metrics"):
+            Translator("en", "fr").translate_obj(*page)
+    finally:
+        sink.disconnect()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith("Translated ") and "from en to fr" in m for m in messages)
+    assert any(m.startswith("Request of 1 segments") for m in messages)
+    assert any(
+        m.startswith("Field testapp.blogpostpage.body (apply)") for m in messages
+    )
+
+
+def test_prometheus_sink(page, prometheus):
+    # The page fixture comes first, its copy is translated by the default behaviour.
+    Translator("en", "fr").translate_obj(*page)
+
+    labels = {"translator": "Translator", "source": "en", "target": "fr"}
+    # ROT13 translates one string per call.
+    requests = prometheus.requests.get(**labels)
+    assert requests >= 4
+    assert prometheus.segments.get(**labels) == requests
+    assert prometheus.request_duration.get(**labels)[2] == requests
+    assert prometheus.batch_duration.get(**labels)[2] == 1
+    assert prometheus.related_queries.get(model="testapp.blogcategory") == 1
+
+    text = prometheus.render()
+    assert (
+        'wagtail_translate_requests_total{translator="Translator",source="en",target="fr"} '
+        f"{requests}"
+    ) in text
+    assert "# TYPE wagtail_translate_request_duration_seconds histogram" in text
+    assert (
+        'wagtail_translate_batch_duration_seconds_bucket{translator="Translator",'
+        'source="en",target="fr",le="+Inf"} 1'
+    ) in text
+
+
+def test_histogram():
+    histogram = Histogram("duration", "Duration.", ("pair",), buckets=(0.1, 1))
+    histogram.observe(0.05, pair='en "fr"')
+    histogram.observe(0.5, pair='en "fr"')
+    assert histogram.samples() == [
+        'duration_bucket{pair="en \\"fr\\"",le="0.1"} 1',
+        'duration_bucket{pair="en \\"fr\\"",le="1.0"} 2',
+        'duration_bucket{pair="en \\"fr\\"",le="+Inf"} 2',
+        'duration_sum{pair="en \\"fr\\""} 0.55',
+        'duration_count{pair="en \\"fr\\""} 2',
+    ]
+
+
+def test_metrics_view(prometheus):
+    response = metrics_view(RequestFactory().get("/"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert b"# HELP wagtail_translate_requests_total" in response.content
+
+
+def test_metrics_view_without_sink(settings):
+    settings.WAGTAIL_TRANSLATE_METRICS = []
+    with pytest.raises(Http404):
+        metrics_view(RequestFactory().get("/"))
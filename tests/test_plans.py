@@ -0,0 +1,143 @@
+import logging
+
+from unittest import mock
+
+import pytest
+
+from wagtail import blocks
+from wagtail.images.blocks import ImageChooserBlock
+from wagtail.models import Page
+from wagtail.snippets.blocks import SnippetChooserBlock
+
+from tests.testapp.models import BlogPostPage
+from wagtail_translate import plans
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+def get_body_plan():
+    return plans.get_block_plan(BlogPostPage._meta.get_field("body").stream_block)
+
+
+def test_body_plan():
+    plan = get_body_plan()
+    assert plan.kind == plans.STREAM
+    assert plan.translatable
+    assert {name: child.kind for name, child in plan.children.items()} == {
+        "heading": plans.TEXT,
+        "paragraph": plans.RICH_TEXT,
+        "stream": plans.STREAM,
+        "stream_nested": plans.STREAM,
+        "list": plans.LIST,
+        "list_nested": plans.LIST,
+        "struct": plans.STRUCT,
+        "image_struct": plans.STRUCT,
+        "raw": plans.RAW_HTML,
+        "block_quote": plans.TEXT,
+        "page": plans.CHOOSER,
+        "document": plans.SKIP,
+        "image_chooser": plans.SKIP,
+        "snippet": plans.CHOOSER,
+    }
+    assert not plan.children["image_chooser"].translatable
+    assert plan.children["struct"].children["paragraph"].translatable
+    assert not plan.children["struct"].children["image"].translatable
+
+
+def test_chooser_model_is_resolved():
+    plan = get_body_plan()
+    assert plan.children["page"].model is Page
+    assert plan.children["heading"].model is None
+
+
+def test_unknown_chooser_model(caplog):
+    block = SnippetChooserBlock("testapp.DoesNotExist")
+    with caplog.at_level(logging.WARNING, logger="wagtail_translate.plans"):
+        plan = plans.get_block_plan(block)
+    assert plan.kind == plans.CHOOSER
+    assert plan.model is None
+    assert "SnippetChooserBlock can't be resolved" in caplog.text
+    # The raw id is kept as it is.
+    assert ROT13Translator("en", "fr").translate_raw_block(plan, 1) == 1
+
+
+def test_chooser_configuration_errors_are_raised():
+    class BrokenChooserBlock(blocks.ChooserBlock):
+        @property
+        def target_model(self):
+            raise RuntimeError("Broken")
+
+    with pytest.raises(RuntimeError):
+        plans.get_block_plan(BrokenChooserBlock())
+
+
+def test_plans_are_cached():
+    assert get_body_plan() is get_body_plan()
+    plans.clear_block_plans()
+    assert get_body_plan() is not plans.get_block_plan(blocks.CharBlock())
+
+
+def test_iterables_without_translatable_blocks_are_skipped():
+    block = blocks.StructBlock(
+        [("url", blocks.URLBlock()), ("image", ImageChooserBlock())]
+    )
+    assert not plans.get_block_plan(block).translatable
+    assert not plans.get_block_plan(blocks.ListBlock(block)).translatable
+    assert plans.get_block_plan(
+        blocks.StreamBlock([("struct", block), ("text", blocks.CharBlock())])
+    ).translatable
+
+
+@pytest.mark.django_db
+def test_skipped_blocks_are_not_walked():
+    stream_block = blocks.StreamBlock(
+        [
+            ("links", blocks.ListBlock(blocks.URLBlock())),
+            ("text", blocks.CharBlock()),
+        ]
+    )
+    value = stream_block.to_python(
+        [
+            {"type": "links", "value": ["https://example.com"]},
+            {"type": "text", "value": "One"},
+        ]
+    )
+    translator = ROT13Translator("en", "fr")
+    with mock.patch.object(
+        translator, "translate_list_block", wraps=translator.translate_list_block
+    ) as translate_list_block:
+        translator.translate_blocks(value)
+
+    translate_list_block.assert_not_called()
+    assert value[1].value == "Bar"
+
+
+@pytest.mark.django_db
+def test_struct_blocks_in_list_blocks():
+    stream_block = blocks.StreamBlock(
+        [
+            (
+                "cards",
+                blocks.ListBlock(
+                    blocks.StructBlock(
+                        [("title", blocks.CharBlock()), ("url", blocks.URLBlock())]
+                    )
+                ),
+            ),
+        ]
+    )
+    value = stream_block.to_python(
+        [
+            {
+                "type": "cards",
+                "value": [
+                    {"title": "One", "url": "https://example.com"},
+                    {"title": "Two", "url": "https://example.com"},
+                ],
+            },
+        ]
+    )
+    ROT13Translator("en", "fr").translate_blocks(value)
+    assert [dict(card) for card in value[0].value] == [
+        {"title": "Bar", "url": "https://example.com"},
+        {"title": "Gjb", "url": "https://example.com"},
+    ]
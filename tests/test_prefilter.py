@@ -0,0 +1,148 @@
+import uuid
+
+import pytest
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.test_batching import BatchRecordingTranslator
+from tests.testapp.models import BlogPostPage
+from wagtail_translate.default_behaviour.translation import translate_and_save_many
+from wagtail_translate.prefilter import PreFilter, get_prefilter
+
+
+@pytest.mark.parametrize(
+    "segment",
+    [
+        "",
+        " \n\t ",
+        "42",
+        "1,234.56",
+        "€ 12,50",
+        "2024-06-12",
+        "12:30",
+        "50%",
+        "+31 (0)20 123 4567",
+        "...",
+        "→",
+        "https://example.com/path?query=1",
+        "www.example.com",
+        "info@example.com",
+        "mailto:info@example.com",
+        "snake_case_name",
+        "settings.py",
+        "wagtail.blocks.CharBlock",
+        "camelCase",
+    ],
+)
+def test_skipped(segment):
+    assert PreFilter().skip(segment)
+
+
+@pytest.mark.parametrize(
+    "segment",
+    [
+        "Hello",
+        "Hello world.",
+        "12 June 2024",
+        "Visit https://example.com for more",
+        "Élan",
+        "Привет",
+        "日本語",
+        "Title",
+        "CamelCase",
+    ],
+)
+def test_not_skipped(segment):
+    assert not PreFilter().skip(segment)
+
+
+def test_patterns_and_predicates():
+    prefilter = PreFilter(
+        rules=[],
+        patterns=[r"SKU-\d+"],
+        predicates=[lambda segment: segment == "Wagtail"],
+    )
+    assert prefilter.skip("SKU-123")
+    assert prefilter.skip(" Wagtail ")
+    assert not prefilter.skip("SKU-123 in stock")
+    # Without rules, only empty segments are skipped.
+    assert prefilter.skip(" ")
+    assert not prefilter.skip("42")
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError):
+        PreFilter(rules=["numbers"])
+
+
+def is_product_name(segment):
+    return segment == "Wagtail"
+
+
+def test_setting(settings):
+    settings.WAGTAIL_TRANSLATE_PREFILTER = {
+        "RULES": ["url"],
+        "PREDICATES": ["tests.test_prefilter.is_product_name"],
+    }
+    prefilter = get_prefilter()
+    assert prefilter.skip("Wagtail")
+    assert prefilter.skip("https://wagtail.org")
+    assert not prefilter.skip("42")
+
+    settings.WAGTAIL_TRANSLATE_PREFILTER = None
+    assert get_prefilter() is None
+
+
+def test_translate_html_skips_segments():
+    translator = BatchRecordingTranslator("en", "fr")
+    html = (
+        "<ul>\n  <li>Price</li>\n  <li>€ 12,50</li>\n"
+        '  <li><a href="https://example.com" title="https://example.com">'
+        "https://example.com</a></li>\n</ul>"
+    )
+
+    translation = translator.batch(translator.translate_html, html)
+
+    assert translator.batches == [["Price"]]
+    assert translation == html.replace("Price", "Cevpr")
+    # Whitespace, the price, the URL text and title.
+    assert translator.stats["skipped"] == 7
+
+
+def test_nothing_to_translate():
+    translator = BatchRecordingTranslator("en", "fr")
+    assert translator.batch(translator.translate_html, "<p> </p><p>42</p>") == (
+        "<p> </p><p>42</p>"
+    )
+    assert translator.batches == []
+    assert translator.translate_calls == 0
+
+
+def test_prefilter_can_be_disabled(settings):
+    settings.WAGTAIL_TRANSLATE_PREFILTER = None
+    translator = BatchRecordingTranslator("en", "fr")
+    translator.batch(translator.translate_html, "<p> </p><p>42</p>")
+    # Empty segments are always skipped.
+    assert translator.batches == [["42"]]
+
+
+@pytest.mark.django_db
+def test_stats(settings):
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = (
+        "tests.test_batching.BatchRecordingTranslator"
+    )
+    page = BlogPostPageFactory(
+        title="Title",
+        body=[
+            {"type": "heading", "value": "2024", "id": str(uuid.uuid4())},
+            {"type": "heading", "value": "Heading", "id": str(uuid.uuid4())},
+        ],
+    )
+    target = page.copy_for_translation(LocaleFactory())
+    page = BlogPostPage.objects.get(pk=page.pk)
+
+    stats = translate_and_save_many([(page, target)])
+
+    # The title and heading are collected. The number, and the empty
+    # seo_title, search_description and intro are skipped.
+    assert stats["segments"] == 2
+    assert stats["skipped"] == 4
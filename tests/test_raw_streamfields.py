@@ -0,0 +1,147 @@
+import copy
+import uuid
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.factories import BlogPostPageFactory, ImageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.fingerprints import get_fingerprints, strip_block_ids
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+pytestmark = pytest.mark.django_db
+
+
+class Translator(ROT13Translator):
+    use_translation_memory = False
+    use_stamps = False
+
+
+def block(block_type, value):
+    return {"type": block_type, "value": value, "id": str(uuid.uuid4())}
+
+
+@pytest.fixture
+def page():
+    LocaleFactory(language_code="en")
+    locale_fr = LocaleFactory(language_code="fr")
+    category = BlogCategory.objects.create(name="Category")
+    translation = category.copy_for_translation(locale_fr)
+    translation.save()
+    untranslated = BlogCategory.objects.create(name="Untranslated")
+    image = ImageFactory()
+
+    page = BlogPostPageFactory(
+        title="Title",
+        body=[
+            block("heading", "Heading"),
+            block(
+                "paragraph",
+                '<p>Hello <a linktype="page" id="3">world</a></p>',
+            ),
+            block("stream_nested", [block("stream", [block("paragraph", "Nested")])]),
+            block(
+                "list_nested",
+                [
+                    block("item", [block("item", "One"), block("item", "Two")]),
+                    block("item", [block("item", "Three")]),
+                ],
+            ),
+            block("struct", {"paragraph": "Caption", "image": image.pk}),
+            block("raw", "<div title='Raw'>Raw</div>"),
+            block("snippet", category.pk),
+            block("snippet", untranslated.pk),
+            block("image_chooser", image.pk),
+        ],
+    )
+    target = page.copy_for_translation(locale_fr)
+    return BlogPostPage.objects.get(pk=page.pk), target, translation, untranslated
+
+
+def translate(source, target, raw):
+    translator = Translator("en", "fr")
+    translator.raw_streamfields = raw
+    with CaptureQueriesContext(connection) as context:
+        translator.translate_obj(source, target)
+    return context.captured_queries
+
+
+def test_raw_mode_translates_like_materialized_mode(page):
+    source, target, translation, untranslated = page
+
+    source_data = copy.deepcopy(source.body.get_prep_value())
+    translate(source, target, raw=True)
+    raw = target.body.get_prep_value()
+    source = BlogPostPage.objects.get(pk=source.pk)
+    translate(source, target, raw=False)
+    materialized = target.body.get_prep_value()
+
+    # The materialized mode gives nested list items new ids.
+    assert strip_block_ids(raw) == strip_block_ids(materialized)
+    assert raw[3]["value"][0]["id"] == source_data[3]["value"][0]["id"]
+    assert raw[0]["value"] == "Urnqvat"
+    assert raw[1]["value"] == '<p>Uryyb <a linktype="page" id="3">jbeyq</a></p>'
+    assert raw[3]["value"][0]["value"][1]["value"] == "Gjb"
+    assert raw[6]["value"] == translation.pk
+    assert raw[7]["value"] == untranslated.pk
+
+
+def test_raw_mode_does_not_load_chooser_objects(page):
+    source, target, *_ = page
+
+    queries = translate(source, target, raw=True)
+
+    assert not any("wagtailimages_image" in query["sql"] for query in queries)
+    category_queries = [
+        query for query in queries if "testapp_blogcategory" in query["sql"]
+    ]
+    # One query to remap the snippet blocks.
+    assert len(category_queries) == 1
+
+
+def test_raw_mode_legacy_list_format():
+    page = BlogPostPageFactory(body=[block("list", ["One", "Two"])])
+    target = page.copy_for_translation(LocaleFactory(language_code="fr"))
+    source = BlogPostPage.objects.get(pk=page.pk)
+
+    translate(source, target, raw=True)
+
+    # The list keeps its format.
+    assert target.body.get_prep_value()[0]["value"] == ["Bar", "Gjb"]
+
+
+def test_raw_mode_leaves_the_source_unchanged(page):
+    source, target, *_ = page
+    raw_data = copy.deepcopy(source.body.get_prep_value())
+
+    translate(source, target, raw=True)
+
+    assert source.body.get_prep_value() == raw_data
+    assert target.body.is_lazy
+
+
+def test_raw_mode_setting(settings):
+    assert not Translator("en", "fr").raw_streamfields
+    settings.WAGTAIL_TRANSLATE_RAW_STREAMFIELDS = True
+    assert Translator("en", "fr").raw_streamfields
+
+
+def test_raw_mode_sync(page):
+    source, target, *_ = page
+    translate(source, target, raw=True)
+    previous = get_fingerprints(source)
+    target.body = target.body.get_prep_value()
+    target.body[0].value = "Corrected"
+
+    source.body.raw_data[5]["value"] = "<p>Changed</p>"
+    translator = Translator("en", "fr")
+    translator.raw_streamfields = True
+    translator.sync_obj(source, target, previous)
+
+    raw = target.body.get_prep_value()
+    assert raw[0]["value"] == "Corrected"
+    assert raw[5]["value"] == "<p>Punatrq</p>"
+    assert raw[6]["value"] != source.body.raw_data[6]["value"]
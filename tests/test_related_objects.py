@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_related_translations_are_fetched_in_bulk():
+    LocaleFactory(language_code="en")
+    locale_fr = LocaleFactory(language_code="fr")
+    categories = [BlogCategory.objects.create(name=f"Category {i}") for i in range(5)]
+    translations = [category.copy_for_translation(locale_fr) for category in categories]
+    for translation in translations:
+        translation.save()
+    untranslated = BlogCategory.objects.create(name="Untranslated")
+
+    page = BlogPostPageFactory(
+        category=categories[0],
+        body=[
+            {"type": "snippet", "value": category.pk, "id": str(uuid.uuid4())}
+            for category in [*categories, untranslated]
+        ],
+    )
+    target = page.copy_for_translation(locale_fr)
+    page = BlogPostPage.objects.get(pk=page.pk)
+
+    translator = ROT13Translator("en", "fr")
+    # The copy is translated already, translate it again.
+    translator.use_stamps = False
+    with CaptureQueriesContext(connection) as context:
+        translator.translate_obj(page, target)
+
+    category_queries = [
+        query
+        for query in context.captured_queries
+        if "testapp_blogcategory" in query["sql"]
+    ]
+    # Load the category FK, load the snippet blocks, fetch all translations.
+    assert len(category_queries) == 3
+
+    assert target.category == translations[0]
+    assert [block.value for block in target.body] == [*translations, untranslated]
+
+
+def test_translate_related_object_outside_batch():
+    locale_fr = LocaleFactory(language_code="fr")
+    category = BlogCategory.objects.create(name="Category")
+    translation = category.copy_for_translation(locale_fr)
+    translation.save()
+
+    translator = ROT13Translator("en", "fr")
+    assert translator.translate_related_object(category) == translation
+    assert translator.translate_related_object("not translatable") == "not translatable"
@@ -0,0 +1,143 @@
+import pytest
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+
+from tests.factories import BlogPostPageFactory, LocaleFactory, create_translated_page
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.default_behaviour.translation import (
+    collect_translations,
+    get_collected_pairs,
+    translate_and_save,
+)
+from wagtail_translate.stamps.models import SourceStamp
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def translated_page(recording_translator):
+    translated_page = create_translated_page()
+    recording_translator.sent = []
+    return translated_page
+
+
+def test_translation_is_stamped(translated_page):
+    source, target = translated_page
+    stamp = SourceStamp.objects.get()
+    assert stamp.translation_key == target.translation_key
+    assert stamp.locale == target.locale
+    assert stamp.source_locale == source.locale
+    assert set(stamp.fields["body"]) == {child.id for child in source.body}
+
+
+def test_unchanged_object_is_skipped(translated_page, recording_translator):
+    source, target = translated_page
+    revisions = target.revisions.count()
+
+    translate_and_save(source, target)
+
+    assert recording_translator.sent == []
+    assert target.revisions.count() == revisions
+
+
+def test_only_changed_fields_are_translated(translated_page, recording_translator):
+    source, target = translated_page
+    source.body[3].value = "Changed"
+    source.save()
+
+    translate_and_save(source, target)
+
+    assert recording_translator.sent == [["Changed"]]
+    target = target.get_latest_revision_as_object()
+    assert target.body[3].value == "Punatrq"
+    assert target.body[4].value == "Urnqvat 4"
+
+    # The stamp is updated, a second run is skipped.
+    recording_translator.sent = []
+    translate_and_save(BlogPostPage.objects.get(pk=source.pk), target)
+    assert recording_translator.sent == []
+
+
+def test_translate_obj_skips_unchanged_objects(translated_page, recording_translator):
+    source, target = translated_page
+    target.title = "Corrected"
+
+    recording_translator("en", "fr").translate_obj(source, target)
+
+    assert recording_translator.sent == []
+    assert target.title == "Corrected"
+
+
+def test_translate_obj_force(translated_page, recording_translator):
+    source, target = translated_page
+    target.title = "Corrected"
+
+    recording_translator("en", "fr").translate_obj(source, target, force=True)
+
+    (sent,) = recording_translator.sent
+    assert "Title" in sent
+    assert "Heading 9" in sent
+    assert target.title == "Gvgyr"
+
+
+def test_collect_translations_counts_unchanged(translated_page, recording_translator):
+    source, target = translated_page
+
+    with collect_translations() as stats:
+        get_collected_pairs().append((source, target))
+
+    assert stats["objects"] == 1
+    assert stats["unchanged"] == 1
+    assert recording_translator.sent == []
+
+
+def test_deleted_translation_is_unstamped():
+    LocaleFactory(language_code="en")
+    category = BlogCategory.objects.create(name="Category")
+    translation = category.copy_for_translation(LocaleFactory(language_code="fr"))
+    translation.save()
+    SourceStamp.objects.store(category, translation, {"name": "0" * 16})
+
+    translation.delete()
+
+    assert not SourceStamp.objects.exists()
+
+
+def test_other_deletes_are_not_slowed_down():
+    # Django only fast deletes models without post_delete receivers.
+    assert post_delete.has_listeners(BlogCategory)
+    assert not post_delete.has_listeners(Session)
+
+
+def test_other_source_locale_is_ignored(translated_page):
+    source, target = translated_page
+    stamp = SourceStamp.objects.get()
+    stamp.source_locale = LocaleFactory(language_code="de")
+    stamp.save()
+
+    assert SourceStamp.objects.lookup(source, target) is None
+
+
+def test_translate_tree_sync(recording_translator, tmp_path):
+    LocaleFactory(language_code="en")
+    LocaleFactory(language_code="fr")
+    root = BlogPostPageFactory(title="Root")
+    children = [
+        BlogPostPageFactory(parent=root, title=f"Child {i}", slug=f"child-{i}")
+        for i in range(3)
+    ]
+    options = ["fr", "--no-snippets", f"--checkpoint={tmp_path / 'checkpoint'}"]
+    call_command("translate_tree", root.pk, *options, verbosity=0)
+    recording_translator.sent = []
+
+    page = BlogPostPage.objects.get(pk=children[1].pk)
+    page.title = "Changed"
+    page.save()
+    call_command("translate_tree", root.pk, *options, "--sync", verbosity=0)
+
+    assert recording_translator.sent == [["Changed"]]
+    translation = page.get_translation(LocaleFactory(language_code="fr"))
+    assert translation.get_latest_revision_as_object().title == "Punatrq"
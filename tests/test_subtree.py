@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from wagtail.actions.copy_for_translation import CopyPageForTranslationAction
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory, BlogPostPage
+from wagtail_translate.default_behaviour.translation import (
+    collect_translations,
+    translate_and_save_many,
+)
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+pytestmark = pytest.mark.django_db
+
+
+class SlowTranslator(ROT13Translator):
+    """ROT13, with the latency of a remote translation service."""
+
+    use_translation_memory = False
+    latency = 0.05
+    threads = set()
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+    sent = []
+
+    def translate_many(self, source_strings):
+        cls = self.__class__
+        with cls.lock:
+            cls.sent.extend(source_strings)
+            cls.threads.add(threading.get_ident())
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(self.latency)
+        with cls.lock:
+            cls.in_flight -= 1
+        return super().translate_many(source_strings)
+
+
+@pytest.fixture
+def slow_translator(settings):
+    settings.WAGTAIL_TRANSLATE_TRANSLATOR = "tests.test_subtree.SlowTranslator"
+    SlowTranslator.threads = set()
+    SlowTranslator.max_in_flight = 0
+    SlowTranslator.sent = []
+
+
+@pytest.fixture
+def subtree():
+    parent = BlogPostPageFactory(title="Parent")
+    for i in range(8):
+        BlogPostPageFactory(parent=parent, title=f"Child {i}")
+    return parent
+
+
+def get_translated_titles(locale):
+    return sorted(
+        page.get_latest_revision_as_object().title
+        for page in BlogPostPage.objects.filter(locale=locale)
+    )
+
+
+def test_collect_translations(slow_translator, subtree):
+    locale = LocaleFactory()
+
+    with collect_translations(max_workers=4):
+        CopyPageForTranslationAction(subtree, locale, include_subtree=True).execute()
+        # Nothing is translated yet.
+        assert get_translated_titles(locale)[0] == "Child 0"
+
+    assert get_translated_titles(locale) == [
+        "Cnerag",
+        *(f"Puvyq {i}" for i in range(8)),
+    ]
+    assert threading.get_ident() not in SlowTranslator.threads
+    assert SlowTranslator.max_in_flight == 4
+
+
+def test_collect_translations_snippets(slow_translator):
+    locale = LocaleFactory()
+    with collect_translations():
+        for name in ["One", "Two"]:
+            BlogCategory.objects.create(name=name).copy_for_translation(locale)
+
+    names = BlogCategory.objects.filter(locale=locale).values_list("name", flat=True)
+    assert sorted(names) == ["Bar", "Gjb"]
+
+
+def test_translate_and_save_many(slow_translator):
+    locale = LocaleFactory()
+    category = BlogCategory.objects.create(name="One")
+    translation = category.copy_for_translation(locale)
+    translation.name = "Untranslated"
+
+    translate_and_save_many([(category, translation)], max_workers=1)
+
+    translation.refresh_from_db()
+    assert translation.name == "Bar"
+
+
+def test_concurrent_subtree_setting(settings, slow_translator, subtree):
+    from wagtail_translate.default_behaviour import monkeypatch_subtree  # noqa
+
+    settings.WAGTAIL_TRANSLATE_CONCURRENT_SUBTREE = True
+    locale = LocaleFactory()
+    CopyPageForTranslationAction(subtree, locale, include_subtree=True).execute()
+
+    assert get_translated_titles(locale)[0] == "Cnerag"
+    assert threading.get_ident() not in SlowTranslator.threads
+
+
+def test_duplicates_are_translated_once(slow_translator):
+    locale = LocaleFactory()
+    parent = BlogPostPageFactory(title="Read more", intro="<p>Read more</p>")
+    for i in range(3):
+        BlogPostPageFactory(
+            parent=parent, title="Read more", slug=f"child-{i}", intro="<p>Intro</p>"
+        )
+
+    with collect_translations() as stats:
+        CopyPageForTranslationAction(parent, locale, include_subtree=True).execute()
+
+    assert get_translated_titles(locale) == ["Ernq zber"] * 4
+    assert sorted(s for s in SlowTranslator.sent if s) == ["Intro", "Read more"]
+    # The parent has 2 occurrences of "Read more", the children 2 strings each.
+    assert stats["objects"] == 4
+    assert stats["duplicates"] == stats["segments"] - len(SlowTranslator.sent)
+    assert stats["duplicates"] >= 6
@@ -0,0 +1,94 @@
+import pytest
+
+from tests.factories import BlogPostPageFactory, create_translated_page, heading
+from tests.testapp.models import BlogPostPage
+from wagtail_translate.default_behaviour.translation import (
+    get_translated_source,
+    sync_translation,
+)
+from wagtail_translate.fingerprints import get_fingerprints
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def translated_page():
+    """A page with 300 blocks, and its translation."""
+    return create_translated_page(headings=300)
+
+
+def test_fingerprints():
+    page = BlogPostPageFactory(title="Title", body=[heading("One"), heading("Two")])
+    fingerprints = get_fingerprints(page)
+
+    assert {"title", "intro", "category", "body"} <= set(fingerprints)
+    assert list(fingerprints["body"]) == [child.id for child in page.body]
+    assert fingerprints == get_fingerprints(BlogPostPage.objects.get(pk=page.pk))
+
+    page.body[0].value = "Changed"
+    changed = get_fingerprints(page)
+    assert changed["body"][page.body[0].id] != fingerprints["body"][page.body[0].id]
+    assert changed["body"][page.body[1].id] == fingerprints["body"][page.body[1].id]
+
+
+def test_sync_translates_changed_blocks(translated_page, recording_translator):
+    source, target = translated_page
+    previous = get_fingerprints(source)
+    # A manual correction of the translation is kept.
+    target.body[1].value = "Corrected"
+
+    source.body[0].value = "Typo fixed"
+    del source.body[2]
+    source.body.append(("heading", "New heading"))
+    recording_translator("en", "fr").sync_obj(source, target, previous)
+
+    assert recording_translator.sent == [["Typo fixed", "New heading"]]
+    assert len(target.body) == 300
+    assert target.body[0].value == "Glcb svkrq"
+    assert target.body[1].value == "Corrected"
+    assert target.body[2].value == "Urnqvat 3"
+    assert target.body[-1].value == "Arj urnqvat"
+    assert [child.id for child in target.body] == [child.id for child in source.body]
+    # Unchanged fields are kept.
+    assert target.title == "Gvgyr"
+    assert target.intro == "<p>Vageb</p>"
+
+
+def test_sync_translates_changed_fields(translated_page, recording_translator):
+    source, target = translated_page
+    previous = get_fingerprints(source)
+    target.intro = "<p>Corrected</p>"
+
+    source.title = "New title"
+    recording_translator("en", "fr").sync_obj(source, target, previous)
+
+    assert recording_translator.sent == [["New title"]]
+    assert target.title == "Arj gvgyr"
+    assert target.intro == "<p>Corrected</p>"
+
+
+def test_sync_without_fingerprints_translates_all(
+    translated_page, recording_translator
+):
+    source, target = translated_page
+    target.body[1].value = "Corrected"
+
+    recording_translator("en", "fr").sync_obj(source, target, {})
+
+    assert target.body[1].value == "Urnqvat 1"
+    assert target.title == "Gvgyr"
+
+
+def test_sync_translation(translated_page, recording_translator):
+    source, target = translated_page
+    assert get_translated_source(source, target).body[0].value == "Heading 0"
+
+    source.body[0].value = "Typo fixed"
+    source.save_revision()
+    sync_translation(source, target)
+
+    assert recording_translator.sent == [["Typo fixed"]]
+    target = target.get_latest_revision_as_object()
+    assert target.body[0].value == "Glcb svkrq"
+    assert target.body[299].value == "Urnqvat 299"
@@ -0,0 +1,178 @@
+from unittest import mock
+
+import pytest
+
+from asgiref.sync import async_to_sync
+
+from wagtail_translate.throttling import (
+    RateLimiter,
+    TransientError,
+    aretry,
+    get_rate_limiter,
+    get_retry_delay,
+    retry,
+)
+from wagtail_translate.translators.rot13 import ROT13Translator
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_rate_limiter(clock, backend, **kwargs):
+    rate_limiter = RateLimiter("test", backend=backend, **kwargs)
+    rate_limiter.clock = clock
+    rate_limiter.sleep = clock.sleep
+    return rate_limiter
+
+
+def test_requests_per_second(locmem_cache):
+    clock = FakeClock()
+    # Two limiters with the same key and cache, like two worker processes.
+    one = make_rate_limiter(clock, locmem_cache, requests_per_second=2)
+    two = make_rate_limiter(clock, locmem_cache, requests_per_second=2)
+
+    one.acquire()
+    two.acquire()
+    assert clock.sleeps == []
+
+    # The budget of this second is used, wait for the next.
+    one.acquire()
+    assert len(clock.sleeps) == 1
+    assert int(clock.now) == 1001
+
+
+def test_characters_per_second(locmem_cache):
+    clock = FakeClock()
+    rate_limiter = make_rate_limiter(clock, locmem_cache, characters_per_second=100)
+
+    rate_limiter.acquire(60)
+    rate_limiter.acquire(40)
+    assert clock.sleeps == []
+    rate_limiter.acquire(1)
+    assert int(clock.now) == 1001
+
+    # A request larger than the budget is let through at the start of a second.
+    rate_limiter.acquire(500)
+    assert int(clock.now) == 1002
+
+
+def test_rejected_request_takes_no_budget(locmem_cache):
+    clock = FakeClock()
+    rate_limiter = make_rate_limiter(
+        clock, locmem_cache, requests_per_second=2, characters_per_second=100
+    )
+
+    rate_limiter.acquire(60)
+    # Does not fit in the characters, the request is not counted.
+    assert not rate_limiter.try_acquire(int(clock.now), 60)
+    rate_limiter.acquire(40)
+    assert clock.sleeps == []
+
+
+def test_acquire_async(locmem_cache):
+    clock = FakeClock()
+    rate_limiter = make_rate_limiter(clock, locmem_cache, requests_per_second=1)
+    rate_limiter.sleep = pytest.fail
+
+    async def asleep(seconds):
+        clock.sleep(seconds)
+
+    rate_limiter.asleep = asleep
+
+    async_to_sync(rate_limiter.aacquire)()
+    async_to_sync(rate_limiter.aacquire)()
+    assert len(clock.sleeps) == 1
+    assert int(clock.now) == 1001
+
+
+def test_rate_limit_is_disabled_by_default():
+    assert get_rate_limiter("test") is None
+
+
+def test_retry():
+    calls = []
+    sleeps = []
+
+    def func():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientError("Too many requests")
+        return "Done"
+
+    result = retry(func, lambda e: isinstance(e, TransientError), sleep=sleeps.append)
+    assert result == "Done"
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_gives_up():
+    sleeps = []
+
+    def func():
+        raise TransientError("Too many requests")
+
+    with pytest.raises(TransientError):
+        retry(func, lambda e: True, attempts=3, sleep=sleeps.append)
+    assert len(sleeps) == 2
+
+
+def test_retry_only_transient_errors():
+    def func():
+        raise ValueError("Bad request")
+
+    with pytest.raises(ValueError):
+        retry(func, lambda e: isinstance(e, TransientError), sleep=pytest.fail)
+
+
+def test_retry_async():
+    calls = []
+    sleeps = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientError("Too many requests")
+        return "Done"
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    result = async_to_sync(aretry)(
+        func, lambda e: isinstance(e, TransientError), sleep=sleep
+    )
+    assert result == "Done"
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_delay():
+    for attempt in range(10):
+        assert 0 <= get_retry_delay(attempt, base_delay=0.5, max_delay=4) <= 4
+    # Retry-After is honoured.
+    assert get_retry_delay(0, base_delay=0.5, max_delay=4, retry_after=20) == 20
+
+
+@mock.patch("wagtail_translate.throttling.time.sleep")
+def test_translator_retries_transient_errors(sleep):
+    class FlakyTranslator(ROT13Translator):
+        use_translation_memory = False
+        failures = 1
+
+        def translate(self, source_string):
+            if self.failures:
+                self.failures -= 1
+                raise TransientError("Service unavailable", retry_after=2)
+            return super().translate(source_string)
+
+    assert FlakyTranslator("en", "fr").translate_many(["One"]) == ["Bar"]
+    sleep.assert_called_once_with(2.0)
@@ -0,0 +1,133 @@
+import json
+
+from unittest import mock
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from wagtail.actions.copy_for_translation import CopyPageForTranslationAction
+
+from tests.factories import BlogPostPageFactory, LocaleFactory
+from tests.testapp.models import BlogCategory, BlogPostPage
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tree():
+    LocaleFactory(language_code="en")
+    LocaleFactory(language_code="fr")
+    LocaleFactory(language_code="nl")
+    root = BlogPostPageFactory(title="Root")
+    for i in range(2):
+        child = BlogPostPageFactory(parent=root, title=f"Child {i}")
+        BlogPostPageFactory(parent=child, title=f"Grandchild {i}")
+    BlogCategory.objects.create(name="Category")
+    return root
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return str(tmp_path / "checkpoint.json")
+
+
+def get_titles(language_code):
+    return sorted(
+        page.get_latest_revision_as_object().title
+        for page in BlogPostPage.objects.filter(locale__language_code=language_code)
+    )
+
+
+def test_translate_tree(tree, checkpoint, tmp_path):
+    call_command(
+        "translate_tree",
+        tree.pk,
+        "fr",
+        "nl",
+        "--chunk-size=2",
+        f"--checkpoint={checkpoint}",
+        verbosity=0,
+    )
+
+    for language_code in ["fr", "nl"]:
+        assert get_titles(language_code) == [
+            "Ebbg",
+            "Puvyq 0",
+            "Puvyq 1",
+            "Tenaqpuvyq 0",
+            "Tenaqpuvyq 1",
+        ]
+        category = BlogCategory.objects.get(locale__language_code=language_code)
+        assert category.name == "Pngrtbel"
+    # A completed run removes its checkpoint.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_missing_translations(tree, checkpoint):
+    tree.copy_for_translation(LocaleFactory(language_code="fr"))
+    call_command(
+        "translate_tree", tree.pk, "fr", f"--checkpoint={checkpoint}", verbosity=0
+    )
+    assert len(get_titles("fr")) == 5
+
+
+def test_resume_after_interruption(tree, checkpoint):
+    execute = CopyPageForTranslationAction.execute
+    calls = []
+
+    def interrupted_execute(self, *args, **kwargs):
+        calls.append(self.page.title)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return execute(self, *args, **kwargs)
+
+    with mock.patch.object(
+        CopyPageForTranslationAction, "execute", interrupted_execute
+    ):
+        with pytest.raises(KeyboardInterrupt):
+            call_command(
+                "translate_tree",
+                tree.pk,
+                "fr",
+                "--chunk-size=2",
+                f"--checkpoint={checkpoint}",
+                verbosity=0,
+            )
+
+    # The first chunk is committed, and recorded.
+    assert get_titles("fr") == ["Ebbg", "Puvyq 0"]
+    with open(checkpoint) as f:
+        assert list(json.load(f)) == ["pages:fr"]
+
+    call_command(
+        "translate_tree",
+        tree.pk,
+        "fr",
+        "--chunk-size=2",
+        f"--checkpoint={checkpoint}",
+        verbosity=0,
+    )
+    assert len(get_titles("fr")) == 5
+
+
+def test_checkpoint_skips_processed_pages(tree, checkpoint):
+    with open(checkpoint, "w") as f:
+        json.dump({"pages:fr": tree.path}, f)
+
+    call_command(
+        "translate_tree",
+        tree.pk,
+        "fr",
+        "--no-snippets",
+        f"--checkpoint={checkpoint}",
+        verbosity=0,
+    )
+    # The root was processed by an earlier run, its copy is made as a parent.
+    assert len(get_titles("fr")) == 5
+    assert not BlogCategory.objects.filter(locale__language_code="fr").exists()
+
+
+def test_unknown_locale(tree, checkpoint):
+    with pytest.raises(CommandError):
+        call_command("translate_tree", tree.pk, "de", f"--checkpoint={checkpoint}")
@@ -0,0 +1,66 @@
+import pytest
+
+from tests.factories import BlogPostPageFactory, LocaleFactory, RecordingTranslator
+from wagtail_translate.translation_memory.models import (
+    TranslationMemory,
+    get_source_hash,
+)
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_lookup_and_store():
+    TranslationMemory.objects.store("en", "fr", {"One": "Un", "Two": "Deux"})
+    assert TranslationMemory.objects.lookup("en", "fr", ["One", "Three"]) == {
+        "One": "Un"
+    }
+    assert TranslationMemory.objects.lookup("en", "nl", ["One"]) == {}
+
+
+def test_store_keeps_existing_entries():
+    TranslationMemory.objects.store("en", "fr", {"One": "Un"})
+    TranslationMemory.objects.store("en", "fr", {"One": "Une", "Two": "Deux"})
+    assert TranslationMemory.objects.count() == 2
+    assert TranslationMemory.objects.lookup("en", "fr", ["One"]) == {"One": "Un"}
+
+
+def test_lookup_ignores_hash_collisions():
+    TranslationMemory.objects.create(
+        source_language_code="en",
+        target_language_code="fr",
+        source_hash=get_source_hash("One"),
+        source_string="Something else",
+        translation="Autre chose",
+    )
+    assert TranslationMemory.objects.lookup("en", "fr", ["One"]) == {}
+
+
+def test_lookup_is_a_single_query(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        TranslationMemory.objects.lookup("en", "fr", [f"Text {i}" for i in range(100)])
+
+
+def test_translator_uses_translation_memory():
+    TranslationMemory.objects.store("en", "fr", {"Title": "Titre"})
+    page = BlogPostPageFactory(title="Title", intro="<p>Hello</p>")
+    target = page.copy_for_translation(LocaleFactory())
+    assert target.title == "Titre"
+    assert target.intro == "<p>Uryyb</p>"
+
+    # New translations are stored, and not translated again.
+    assert TranslationMemory.objects.lookup("en", "fr", ["Hello"]) == {"Hello": "Uryyb"}
+    page.title = "New title"
+    translator = RecordingTranslator("en", "fr")
+    translator.use_translation_memory = True
+    translator.translate_obj(page, target)
+    assert translator.batches == [["New title"]]
+    assert target.intro == "<p>Uryyb</p>"
+
+
+def test_translator_without_translation_memory():
+    TranslationMemory.objects.store("en", "fr", {"Title": "Titre"})
+    translator = RecordingTranslator("en", "fr")
+    translator.use_translation_memory = False
+    assert translator.translate_html("<p>Title</p>") == "<p>Gvgyr</p>"
+    assert translator.batches == [["Title"]]
@@ -41,6 +41,9 @@ INSTALLED_APPS = [
     "tests.testapp",
     "wagtail_translate",
     "wagtail_translate.default_behaviour",
+    "wagtail_translate.translation_memory",
+    "wagtail_translate.background",
+    "wagtail_translate.stamps",
     "wagtail.contrib.simple_translation",
     "wagtail.locales",
     "wagtail.contrib.search_promotions",